@@ -1,6 +1,28 @@
-import pandas as pd
+import argparse
+import codecs
+import csv
+import gc
+import gzip
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
 # === DOSYA AYARLARI ===
 FILE_PATH = "gfk_sales_202546_20251117050122.csv"         # Ana satış datası
 GIFTCARD_FILE_PATH = "gfk_gift_card_20251117055556.csv"   # Gift card datası
@@ -14,6 +36,12 @@ BRAND_COL = "Marka"          # Marka sütunu adı
 STORE_COL = "Magaza"         # Mağaza sütunu adı
 PRODUCT_COL = "Uzun Tanım"   # Ürün açıklaması sütunu
 CATEGORY3_COL = "Kategori3"   # Refurbished kırılımları için kullanılacak kategori
+DATE_COL = "Tarih"           # Satış tarihi (yoksa DATE_COL_CANDIDATES'tan ilk eşleşen sütun kullanılır)
+DATE_COL_CANDIDATES = (      # Büyük/küçük harf, Türkçe karakter ve '_' farkı gözetmeden tam ad eşleşmesi
+    "Tarih", "Satış Tarihi", "Sipariş Tarihi", "Fatura Tarihi", "Teslim Tarihi", "Islem Tarihi",
+    "Date", "Sales Date", "Order Date", "Invoice Date",
+)
+DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y%m%d", "%d.%m.%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
 
 
 # === GIFTCARD DATASI SÜTUN İSİMLERİ ===
@@ -34,6 +62,101 @@ ONLINE_STORES = {
     "TRENDYOL",
 }
 
+# === KLASÖR İZLEME (WATCH) AYARLARI ===
+WATCH_SALES_PREFIX = "gfk_sales_"              # Ana satış teslimatı dosya öneki
+WATCH_GIFTCARD_PREFIX = "gfk_gift_card_"       # Gift card teslimatı dosya öneki
+WATCH_POLL_SECONDS = 10                        # Inbox tarama aralığı (saniye)
+WATCH_MAX_WORKERS = 2                          # Aynı anda işlenecek en fazla teslimat
+WATCH_PAIR_WAIT_SECONDS = 300                  # Satış dosyası için gift card eşini bekleme süresi
+WATCH_LEDGER_FILE = ".statvision_islenenler.json"   # Outbox'ta tutulan işlenmiş dosya kaydı
+
+# === BULANIK (FUZZY) ÜRÜN ARAMA AYARLARI ===
+FUZZY_MIN_SIMILARITY = 0.3     # Aramadaki trigramların en az bu oranı üründe geçmeli
+FUZZY_RESULT_LIMIT = 20        # Gösterilecek en fazla öneri
+FUZZY_CACHE_SIZE = 256         # Son sorgu sonuçları için LRU cache boyutu
+
+# === ÜRÜN KATALOĞU AYARLARI ===
+EXCEL_MAX_ROWS = 1_048_576              # Excel'in sayfa başına satır sınırı
+CATALOGUE_SHEET_NAME = "UrunKatalog"    # Tüm ürünler sayfası (sınır aşılırsa _2, _3 ... eklenir)
+CATALOGUE_IN_EXCEL = True               # Tüm ürün kataloğunu Excel raporuna da yaz
+
+# === BİRİM FİYAT DAĞILIMI AYARLARI ===
+PRICE_PERCENTILES = [          # (oran, kolon adı)
+    (0.10, "P10_Birim_Fiyat"),
+    (0.25, "P25_Birim_Fiyat"),
+    (0.50, "Medyan_Birim_Fiyat"),
+    (0.75, "P75_Birim_Fiyat"),
+    (0.90, "P90_Birim_Fiyat"),
+]
+
+# === GÜNLÜK TREND AYARLARI ===
+TREND_SHEET_NAME = "GunlukTrend"
+
+# === GIFT CARD MUTABAKAT AYARLARI ===
+RECON_SHEET_NAME = "GiftCardMutabakat"
+RECON_AMOUNT_TOLERANCE = 0.01         # TL; net tutar farkı bunun altındaysa uyumlu sayılır
+RECON_QTY_TOLERANCE = 0               # Adet farkı bunun üstündeyse fark sayılır
+TR_ASCII_TABLE = str.maketrans("İIıŞşĞğÜüÖöÇç", "iiissgguuoocc")   # Ürün adı eşleştirme anahtarı için
+
+# === VERİ KALİTESİ AYARLARI ===
+QUARANTINE_CHUNK_ROWS = 100_000   # Karantina CSV'sine tek seferde yazılacak satır sayısı
+
+# === HIZLI ÖNİZLEME (PREVIEW) AYARLARI ===
+PREVIEW_BLOCKS = 400               # Dosyanın bölüneceği eşit byte dilimi sayısı (her dilimden bir blok)
+PREVIEW_BLOCK_BYTES = 64 * 1024    # Her dilimden okunacak blok boyutu
+PREVIEW_Z = 1.96                   # %95 güven aralığı için z değeri
+
+# === BELLEK BÜTÇESİ PLANLAYICI AYARLARI ===
+PLANNER_SAMPLE_ROWS = 20_000          # Kardinalite / satır boyutu için okunacak örnek satır
+PLANNER_CATEGORY_MAX_RATIO = 0.5      # Farklı değer oranı bunun altındaki metin kolonları category olur
+PLANNER_OVERHEAD = 3.0                # Parse + groupby geçici kopyaları için bellek çarpanı
+PLANNER_COMPRESSION_RATIO = 6.0       # Açık boyutu bilinmeyen .gz/.zst için varsayılan sıkıştırma oranı
+PLANNER_MIN_CHUNK_ROWS = 10_000       # Parça boyutu bunun altına düşürülmez
+PLANNER_COMPACT_EVERY = 20            # Kaç parçada bir ara toplamlar yeniden sıkıştırılır
+PLANNER_REGROW_RATIO = 0.6            # RSS sınırın bu oranının altına inerse küçültülen parça boyutu tekrar büyür
+
+# === PARQUET VERİ SETİ AYARLARI ===
+DATASET_WEEK_COL = "hafta"            # Bölüm kolonu: GfK teslimat haftası (YYYYWW)
+DATASET_CHANNEL_COL = "kanal"         # Bölüm kolonu: Online / Fiziksel / Bilinmeyen
+DATASET_ROW_GROUP_ROWS = 100_000      # Row group boyutu (mağaza/kategori min-max istatistikleri için)
+DATASET_META_FILE = "_statvision_meta.json"   # Hafta başına kaynak dosya / bozuk satır kaydı ('_' önekli: veri seti taramasına girmez)
+
+# === ÇIKTI FORMATLARI AYARLARI ===
+REPORT_FORMATS = ("xlsx",)            # Varsayılan çıktı formatları
+REPORT_FORMAT_CHOICES = ("xlsx", "csv", "parquet", "html")   # Desteklenen tüm çıktı formatları
+REPORT_WORKERS = min(8, os.cpu_count() or 2)   # Sayfa tablolarını / formatları hazırlayan iş parçacığı sayısı
+HTML_MAX_ROWS = 50                    # HTML panoda tablo başına gösterilecek en fazla satır
+
+# === PAYLAŞILAN BELLEK (SÜREÇ İŞÇİLERİ) AYARLARI ===
+PROCESS_WORKERS = 0                   # > 0 ise rapor bölümleri bu kadar süreçte hesaplanır (0: iş parçacığı)
+SHARED_FRAME_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None   # Arrow dosyaları (None: sistem temp)
+
+# === SONUÇ ÖNBELLEĞİ AYARLARI ===
+RESULT_CACHE_DIR = ".statvision_cache"   # get_* çıktılarının saklandığı klasör
+RESULT_CACHE_VERSION = "1"               # Ortak mantık / ayar değişince artırılır (tüm önbellek geçersizleşir)
+RESULT_CACHE_MAX_FILES = 500             # Bu sayının üstünde en eski kayıtlar silinir
+
+# === REGRESYON TESTİ AYARLARI ===
+REGRESSION_RTOL = 1e-9                # Golden tablolarla sayısal karşılaştırma (göreli tolerans)
+REGRESSION_ATOL = 1e-6                # Golden tablolarla sayısal karşılaştırma (mutlak tolerans)
+REGRESSION_REPEATS = 3                # Süre ölçümü için tekrar sayısı (en iyisi alınır)
+REGRESSION_TIME_RATIO = 1.5           # Aşama süresi baz çizginin en fazla bu katı olabilir
+REGRESSION_TIME_SLACK_SECONDS = 0.25  # Çok kısa aşamalardaki ölçüm gürültüsü için pay
+REGRESSION_MEMORY_RATIO = 1.3         # Aşama tepe belleği baz çizginin en fazla bu katı olabilir
+REGRESSION_MEMORY_SLACK_MB = 5.0      # Küçük fixture'larda bellek ölçüm payı
+REGRESSION_BASELINE_FILE = "baseline.json"
+
+# === CSV LEHÇE (DIALECT) ALGILAMA AYARLARI ===
+SNIFF_SAMPLE_BYTES = 2 * 1024 * 1024  # Kodlama / ayraç / ondalık tespiti için okunan baş kısım
+SNIFF_SAMPLE_LINES = 200              # Ayraç ve ondalık tespitinde bakılan satır sayısı
+SNIFF_DELIMITERS = ";,\t|"           # Aday ayraçlar (öncelik sırasıyla)
+SNIFF_FALLBACK_ENCODING = "cp1254"    # UTF-8 olarak çözülemeyen dosyalar için (Türkçe Windows)
+
+# === SIKIŞTIRILMIŞ GİRDİ AYARLARI ===
+DECOMPRESS_WORKERS = max(1, (os.cpu_count() or 2) - 1)   # Çok frame'li .zst için paralel çözücü sayısı
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E    # zstd seekable formatında seek table'ı taşıyan skippable frame
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1     # seek table footer imzası
+
 
 # === GİRİŞ / ÇIKIŞ MESAJLARI ===
 def print_banner():
@@ -52,19 +175,346 @@ def print_goodbye():
     print("==============================\n")
 
 
+# === GİRDİ DOSYASI AÇMA (.gz / .zst DESTEĞİ) ===
+
+def read_zstd_seek_table(path: str) -> list[tuple[int, int, int]] | None:
+    """
+    zstd "seekable" formatındaki dosyanın sonundaki seek table'ı okur.
+    Dönüş: her frame için (başlangıç_offset, sıkıştırılmış_boyut, açık_boyut)
+    listesi. Dosya bu formatta değilse None döner.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size < 17:
+            return None
+
+        f.seek(size - 9)
+        n_frames, descriptor, magic = struct.unpack("<IBI", f.read(9))
+        if magic != ZSTD_SEEKABLE_MAGIC:
+            return None
+
+        entry_size = 12 if descriptor & 0x80 else 8   # bit 7: frame checksum'ları var mı
+        table_size = n_frames * entry_size
+        if size < table_size + 17:
+            return None
+
+        f.seek(size - 17 - table_size)
+        skip_magic, frame_size = struct.unpack("<II", f.read(8))
+        if skip_magic != ZSTD_SKIPPABLE_MAGIC or frame_size != table_size + 9:
+            return None
+        table = f.read(table_size)
+
+    frames = []
+    offset = 0
+    for i in range(n_frames):
+        c_size, d_size = struct.unpack_from("<II", table, i * entry_size)
+        frames.append((offset, c_size, d_size))
+        offset += c_size
+    return frames
+
+
+def iter_zstd_frames_parallel(path: str, frames: list, workers: int = DECOMPRESS_WORKERS):
+    """
+    Seek table'ı bilinen .zst dosyasının frame'lerini thread havuzunda paralel
+    çözer ve açılmış byte bloklarını dosyadaki sırayla üretir (yield).
+    Bellekte en fazla workers * 2 frame bekletilir.
+    """
+    import zstandard
+
+    def decode(frame):
+        offset, c_size, d_size = frame
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(c_size)
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=d_size)
+
+    remaining = iter(frames)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(decode, fr) for _, fr in zip(range(workers * 2), remaining))
+        while pending:
+            data = pending.popleft().result()
+            nxt = next(remaining, None)
+            if nxt is not None:
+                pending.append(pool.submit(decode, nxt))
+            yield data
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Byte blokları üreten bir iterator'ı okunabilir (raw) dosya nesnesine çevirir.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buf = memoryview(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def open_input_bytes(path: str):
+    """
+    Girdi dosyasını uzantısına göre ikili (binary) akış olarak açar:
+    - .gz        : gzip ile akış halinde açılır
+    - .zst/.zstd : seekable formatta birden çok frame varsa frame'ler paralel,
+                   değilse tek akışta çözülür ('zstandard' paketi gerekir)
+    - diğer      : düz dosya
+    Dosya diske açılmadan, okundukça çözülür.
+    """
+    lower = path.lower()
+
+    if lower.endswith(".gz"):
+        return gzip.open(path, "rb")
+
+    if lower.endswith((".zst", ".zstd")):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(".zst dosyalarını okumak için 'zstandard' paketi gerekli: pip install zstandard")
+
+        frames = read_zstd_seek_table(path)
+        if frames and len(frames) > 1 and DECOMPRESS_WORKERS > 1:
+            raw = ChunkStream(iter_zstd_frames_parallel(path, frames))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.BufferedReader(raw, buffer_size=1 << 20)
+
+    return open(path, "rb")
+
+
+def open_input(path: str, encoding: str = "utf-8", errors: str = "replace"):
+    """
+    Girdi dosyasını (düz, .gz veya .zst) verilen kodlamayla metin akışı olarak açar.
+    Kodlama okundukça çözülür; dosyanın tamamı ayrıca yeniden kodlanmaz.
+    Kodlama örneklemden seçildiği için dosyanın ilerisindeki çözülemeyen baytlar
+    varsayılan olarak '\ufffd' ile değiştirilir (okuma yarıda kesilmez);
+    BadLineCountingStream bunları sayar.
+    """
+    if path.lower().endswith((".gz", ".zst", ".zstd")):
+        return io.TextIOWrapper(open_input_bytes(path), encoding=encoding, errors=errors)
+    return open(path, "r", encoding=encoding, errors=errors)
+
+
+def get_file_stem(path: str) -> str:
+    """
+    Dosya adını klasör ve tüm uzantılar (.csv.gz gibi) olmadan döner.
+    """
+    return os.path.basename(path).split(".")[0]
+
+
+# === CSV LEHÇE (DIALECT) ALGILAMA ===
+
+_DIALECT_CACHE = {}
+_QUOTED_FIELD_RE = re.compile(r'"[^"]*"')
+
+
+def count_fields(line: str, sep: str, quoted: bool = False) -> int:
+    """
+    Satırdaki alan sayısı. quoted ise tırnak içindeki ayraçlar sayılmaz
+    (ör. virgül ayraçlı dosyada "1.234,56").
+    """
+    if quoted and '"' in line:
+        line = _QUOTED_FIELD_RE.sub("", line)
+    return line.count(sep) + 1
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Örnek baytlardan kodlamayı bulur: BOM varsa ona göre (utf-8-sig / utf-16),
+    yoksa UTF-8 olarak çözülebiliyorsa utf-8, çözülemiyorsa cp1254.
+    Örnek bir karakterin ortasında bitebileceği için artımlı çözücü kullanılır.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return SNIFF_FALLBACK_ENCODING
+
+
+def detect_delimiter(lines: list[str]) -> str:
+    """
+    Aday ayraçlar arasından, header'da geçen ve satırların en büyük kısmında
+    header ile aynı sayıda geçen ayracı seçer (bozuk satırlar oylamayı bozmaz).
+    Eşitlikte SNIFF_DELIMITERS sırası geçerlidir; hiçbiri yoksa ';'.
+    """
+    if not lines:
+        return ";"
+    header, rows = lines[0], lines[1:] or lines[:1]
+    best, best_score = ";", (0.0, 0)
+    for delim in SNIFF_DELIMITERS:
+        expected = count_fields(header, delim, quoted=True)
+        if expected == 1:
+            continue
+        score = (sum(count_fields(row, delim, quoted=True) == expected for row in rows) / len(rows), expected)
+        if score > best_score:
+            best, best_score = delim, score
+    return best
+
+
+def detect_decimal(lines: list[str], sep: str, quotechar: str = '"') -> str | None:
+    """
+    Sayı görünümlü alanlardan ondalık ayracını bulur:
+    '1.234,56' / '12,5' -> ',' (TR), '1,234.56' / '12.5' -> '.'.
+    '1.234' gibi iki okumaya da uyan değerler iki tarafa da sayılır.
+    Karar verilemezse None döner (clean_numeric_column kolon bazında tahmin eder).
+    """
+    reader = csv.reader(lines[1:], delimiter=sep, quotechar=quotechar)
+    fields = pd.Series([f.strip() for row in reader for f in row], dtype=object)
+    if fields.empty:
+        return None
+    comma = fields.str.fullmatch(r"-?\d{1,3}(?:\.\d{3})+(?:,\d+)?|-?\d+,\d+").sum()
+    dot = fields.str.fullmatch(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+\.\d+").sum()
+    if comma == dot:
+        return None
+    return "," if comma > dot else "."
+
+
+def sniff_dialect(path: str, sample_bytes: int = SNIFF_SAMPLE_BYTES) -> dict:
+    """
+    Dosyanın ilk sample_bytes baytından (sıkıştırılmışsa çözülmüş halinden)
+    CSV lehçesini çıkarır:
+    - encoding : utf-8 / utf-8-sig (BOM) / utf-16 / cp1254
+    - sep      : ayraç (; , tab |)
+    - quotechar: tırnak karakteri, quoted: örnekte tırnaklı alan var mı
+    - decimal  : ',' / '.' / None (belirsiz)
+    - engine   : tek karakterli ayraçta pandas C parser, değilse python parser
+    Sonuç (yol, boyut, değişiklik zamanı) anahtarıyla önbelleğe alınır;
+    aynı dosya için sayım + okuma + kalite adımları tekrar örneklemez.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime)
+    if key in _DIALECT_CACHE:
+        return _DIALECT_CACHE[key]
+
+    with open_input_bytes(path) as f:
+        sample = f.read(sample_bytes)
+
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample, final=False)
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    lines = [line for line in text.splitlines()[:SNIFF_SAMPLE_LINES + 1] if line.strip()]
+    if len(text) >= sample_bytes // 4 and len(lines) > 1 and not text.endswith("\n"):
+        lines = lines[:-1]   # Örneğin sonundaki yarım satır
+
+    sep = detect_delimiter(lines)
+    quotechar = '"'
+    dialect = {
+        "encoding": encoding,
+        "sep": sep,
+        "quotechar": quotechar,
+        "quoted": quotechar in text,
+        "decimal": detect_decimal(lines, sep, quotechar),
+        "engine": "c" if len(sep) == 1 else "python",
+    }
+    _DIALECT_CACHE[key] = dialect
+    return dialect
+
+
+def get_read_csv_kwargs(dialect: dict) -> dict:
+    """
+    Lehçeye göre pd.read_csv parametreleri (ayraç, tırnak, parser motoru).
+    Sayı dönüşümü clean_numeric_column'da yapıldığı için decimal burada verilmez.
+    """
+    return {"sep": dialect["sep"], "quotechar": dialect["quotechar"], "engine": dialect["engine"]}
+
+
+def warn_replaced_chars(path: str, encoding: str, replaced: int):
+    """
+    Çözülemeyip '\ufffd' ile değiştirilen karakter varsa uyarı basar.
+    """
+    if replaced:
+        print(f"⚠️ {os.path.basename(path)}: {replaced:,} karakter '{encoding}' ile çözülemedi, "
+              f"'\ufffd' ile değiştirildi (dosyanın ilerisinde farklı kodlanmış satırlar olabilir).")
+
+
+class BadLineCountingStream:
+    """
+    Metin akışını pandas'a aktarırken aynı anda count_bad_lines ile aynı
+    kurala göre bozuk satırları sayar. Böylece sıkıştırılmış dosya
+    bozuk satır sayımı ve parse için iki kez çözülmez.
+    Kodlamayla çözülemeyip '\ufffd' ile değiştirilen karakterler de sayılır (replaced).
+    """
+
+    def __init__(self, stream, sep: str = ";", quoted: bool = False):
+        self._stream = stream
+        self._sep = sep
+        self._quoted = quoted
+        self._tail = ""
+        self.expected_cols = None
+        self.bad = 0
+        self.replaced = 0
+
+    def _count(self, line: str):
+        if self.expected_cols is None:
+            self.expected_cols = count_fields(line.rstrip("\n"), self._sep, self._quoted)
+        elif count_fields(line, self._sep, self._quoted) != self.expected_cols:
+            self.bad += 1
+
+    def read(self, size: int = -1) -> str:
+        data = self._stream.read(size)
+        self.replaced += data.count("\ufffd")
+        text = self._tail + data
+        lines = text.split("\n")
+        self._tail = lines.pop()
+        if not data and self._tail:
+            lines.append(self._tail)
+            self._tail = ""
+        for line in lines:
+            self._count(line)
+        return data
+
+    def readline(self) -> str:
+        line = self._stream.readline()
+        if line:
+            self.replaced += line.count("\ufffd")
+            self._count(line)
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def close(self):
+        self._stream.close()
+
+
 def count_bad_lines(path: str) -> int:
     """
     Verilen CSV dosyasındaki bozuk satırları sayar.
-    Yöntem: header'daki ; sayısını referans alıp her satırla karşılaştırmak.
+    Yöntem: header'daki ayraç sayısını referans alıp her satırla karşılaştırmak.
     """
     bad = 0
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        dialect = sniff_dialect(path)
+        sep, quoted = dialect["sep"], dialect["quoted"]
+        with open_input(path, dialect["encoding"]) as f:
             header = f.readline().rstrip("\n")
-            expected_cols = header.count(";") + 1
+            expected_cols = count_fields(header, sep, quoted)
 
             for line in f:
-                col_count = line.count(";") + 1
+                col_count = count_fields(line, sep, quoted)
                 if col_count != expected_cols:
                     bad += 1
     except FileNotFoundError:
@@ -73,13 +523,18 @@ def count_bad_lines(path: str) -> int:
     return bad
 
 
-def clean_numeric_column(df: pd.DataFrame, col: str) -> pd.Series:
+def clean_numeric_column(df: pd.DataFrame, col: str, parse_errors: dict | None = None,
+                         decimal: str | None = None) -> pd.Series:
     """
     Sayısal kolonları akıllı şekilde temizler.
     - Eğer zaten numerik ise: sadece NaN -> 0
     - Eğer string ise:
         * Eğer çoğu değerde ',' varsa TR formatı varsayılır: 1.234,56 -> 1234.56
         * Sonra to_numeric uygulanır.
+    decimal (dosya lehçesinden gelen ',' / '.') verilirse kolon bazındaki
+    ',' oranı tahmini yerine o kullanılır; '.' ise binlik ',' ayırıcıları silinir.
+    parse_errors sözlüğü verilirse, boş olmadığı halde sayıya çevrilemeyen
+    (0'a dönüştürülen) değerlerin ham halleri parse_errors[col] içine yazılır.
     """
     if col not in df.columns:
         return pd.Series(dtype="float64")
@@ -97,29 +552,80 @@ def clean_numeric_column(df: pd.DataFrame, col: str) -> pd.Series:
     # Değerlerin ne kadarında ',' var? (TR formatını tespit için)
     comma_ratio = s_str.str.contains(",", regex=False).mean()
 
-    if comma_ratio > 0.5:
+    if decimal == ".":
+        s_str = s_str.str.replace(",", "", regex=False)
+    elif decimal == "," or (decimal is None and comma_ratio > 0.5):
         # Büyük ihtimalle TR formatı: 1.234,56
         # Önce binlik ayırıcı '.' kaldır, sonra ',' -> '.'
         s_str = s_str.str.replace(".", "", regex=False)
         s_str = s_str.str.replace(",", ".", regex=False)
 
-    df[col] = pd.to_numeric(s_str, errors="coerce").fillna(0)
+    parsed = pd.to_numeric(s_str, errors="coerce")
+
+    if parse_errors is not None:
+        failed = parsed.isna() & s.notna() & s_str.ne("")
+        parse_errors[col] = s[failed]
+
+    df[col] = parsed.fillna(0)
     return df[col]
 
 
+def read_csv_counting_bad_lines(path: str, dtype: dict | None = None) -> tuple[pd.DataFrame, int]:
+    """
+    CSV'yi (düz, .gz veya .zst) sniff_dialect'in bulduğu kodlama / ayraç ve
+    parser ile tek akışta okur; bozuk satırları atlarken count_bad_lines ile
+    aynı kurala göre sayar.
+    dtype verilirse (örn. planlayıcının seçtiği category kolonları) read_csv'ye aktarılır.
+    Dönüş: (DataFrame, bozuk_satır_sayısı)
+    """
+    dialect = sniff_dialect(path)
+    with open_input(path, dialect["encoding"]) as stream:
+        counter = BadLineCountingStream(stream, dialect["sep"], dialect["quoted"])
+        df = pd.read_csv(
+            counter,
+            **get_read_csv_kwargs(dialect),
+            on_bad_lines="skip",
+            dtype=dtype
+        )
+    warn_replaced_chars(path, dialect["encoding"], counter.replaced)
+    return df, counter.bad
+
+
 def load_data(path: str) -> pd.DataFrame:
     """
-    Ana satış datasını ; delimiter ile okur.
+    Ana satış datasını dosyadan tespit edilen kodlama ve ayraçla okur
+    (GfK dosyalarında genelde UTF-8 ve ;).
     Bozuk satırları atlar ve numerik kolonları hazırlar.
     """
-    df = pd.read_csv(
-        path,
-        sep=";",
-        encoding="utf-8",
-        engine="python",
-        on_bad_lines="skip"
-    )
+    dialect = sniff_dialect(path)
+    with open_input(path, dialect["encoding"]) as stream:
+        df = pd.read_csv(
+            stream,
+            **get_read_csv_kwargs(dialect),
+            on_bad_lines="skip"
+        )
+
+    return clean_sales_df(df, decimal=dialect["decimal"])
+
 
+def load_data_with_bad_lines(path: str, parse_errors: dict | None = None,
+                             dtype: dict | None = None) -> tuple[pd.DataFrame, int]:
+    """
+    load_data ile aynı, ancak bozuk satır sayısı aynı okuma sırasında
+    çıkarılır (dosya iki kez okunmaz / çözülmez).
+    parse_errors verilirse sayıya çevrilemeyen değerler buraya toplanır.
+    """
+    df, bad = read_csv_counting_bad_lines(path, dtype)
+    return clean_sales_df(df, parse_errors, sniff_dialect(path)["decimal"]), bad
+
+
+def clean_sales_df(df: pd.DataFrame, parse_errors: dict | None = None,
+                   decimal: str | None = None) -> pd.DataFrame:
+    """
+    Okunmuş ana satış datasında kanal kodunu, mağaza isimlerini ve
+    adet & ciro kolonlarını temizler, tarih sütununu datetime'a çevirir.
+    decimal: dosya lehçesindeki ondalık ayracı.
+    """
     # TSAMP → online olarak işaretle (çok büyük bir numeric değere dönüştür)
     df[ORG_COL] = df[ORG_COL].replace("TSAMP", "999999")
 
@@ -131,8 +637,11 @@ def load_data(path: str) -> pd.DataFrame:
         df[STORE_COL] = df[STORE_COL].astype(str).str.strip()
 
     # Adet & ciro kolonlarını temizle
-    clean_numeric_column(df, QTY_COL)
-    clean_numeric_column(df, REVENUE_COL)
+    clean_numeric_column(df, QTY_COL, parse_errors, decimal)
+    clean_numeric_column(df, REVENUE_COL, parse_errors, decimal)
+
+    # Tarih sütunu (varsa) bir kez datetime'a çevrilir
+    parse_date_column(df, parse_errors)
 
     return df
 
@@ -140,24 +649,46 @@ def load_data(path: str) -> pd.DataFrame:
 def load_giftcard_data(path: str) -> pd.DataFrame:
     """
     Gift card datasını okur.
-    Aynı delimiter ve sayısal temizleme mantığı kullanılır.
+    Aynı lehçe tespiti ve sayısal temizleme mantığı kullanılır.
     """
     try:
-        df = pd.read_csv(
-            path,
-            sep=";",
-            encoding="utf-8",
-            engine="python",
-            on_bad_lines="skip"
-        )
+        dialect = sniff_dialect(path)
+        with open_input(path, dialect["encoding"]) as stream:
+            df = pd.read_csv(
+                stream,
+                **get_read_csv_kwargs(dialect),
+                on_bad_lines="skip"
+            )
     except FileNotFoundError:
         print(f"\n⚠️ Gift card dosyası bulunamadı: {path}")
         return pd.DataFrame()
 
+    return clean_giftcard_df(df, decimal=dialect["decimal"])
+
+
+def load_giftcard_data_with_bad_lines(path: str, parse_errors: dict | None = None) -> tuple[pd.DataFrame, int]:
+    """
+    load_giftcard_data ile aynı, ancak bozuk satır sayısı aynı okuma
+    sırasında çıkarılır. Dosya yoksa (boş DataFrame, 0) döner.
+    """
+    try:
+        df, bad = read_csv_counting_bad_lines(path)
+    except FileNotFoundError:
+        print(f"\n⚠️ Gift card dosyası bulunamadı: {path}")
+        return pd.DataFrame(), 0
+
+    return clean_giftcard_df(df, parse_errors, sniff_dialect(path)["decimal"]), bad
+
+
+def clean_giftcard_df(df: pd.DataFrame, parse_errors: dict | None = None,
+                      decimal: str | None = None) -> pd.DataFrame:
+    """
+    Okunmuş gift card datasında numerik kolonları temizler.
+    """
     # Numerik kolonları temizle
-    clean_numeric_column(df, GC_QTY_COL)
-    clean_numeric_column(df, GC_INVOICE_COL)
-    clean_numeric_column(df, GC_DISC_COL)
+    clean_numeric_column(df, GC_QTY_COL, parse_errors, decimal)
+    clean_numeric_column(df, GC_INVOICE_COL, parse_errors, decimal)
+    clean_numeric_column(df, GC_DISC_COL, parse_errors, decimal)
 
     return df
 
@@ -175,6 +706,198 @@ def find_renewed_column(df: pd.DataFrame) -> str | None:
     return None
 
 
+def find_date_column(df: pd.DataFrame) -> str | None:
+    """
+    Tarih sütununu döner: DATE_COL varsa o, yoksa adı DATE_COL_CANDIDATES'tan
+    biriyle birebir eşleşen ilk sütun (UPDATED_BY, VALIDATE_FLAG gibi adında
+    sadece 'DATE' geçen sütunlar seçilmez). Bulamazsa None döner.
+    """
+    if DATE_COL in df.columns:
+        return DATE_COL
+
+    def normalize(name) -> str:
+        return " ".join(str(name).translate(TR_ASCII_TABLE).lower().replace("_", " ").split())
+
+    candidates = {normalize(c) for c in DATE_COL_CANDIDATES}
+    for col in df.columns:
+        if normalize(col) in candidates:
+            return col
+    return None
+
+
+def parse_date_column(df: pd.DataFrame, parse_errors: dict | None = None) -> str | None:
+    """
+    Tarih sütununu yükleme sırasında bir kez datetime64[s] tipine çevirir
+    (satır başına metin yerine 8 byte). Farklı tarih sayısı az olduğu için
+    sadece farklı değerler parse edilir ve satırlara kodla dağıtılır.
+    DATE_FORMATS içinden en çok değeri okuyabilen format seçilir; hiçbir
+    değer okunamıyorsa sütun olduğu gibi bırakılır.
+    parse_errors verilirse okunamayan ham değerler parse_errors[sütun] içine yazılır.
+    Dönüş: çevrilen sütunun adı veya None.
+    """
+    col = find_date_column(df)
+    if col is None:
+        return None
+    if pd.api.types.is_datetime64_any_dtype(df[col]):
+        return col
+
+    s = df[col]
+    codes, uniques = pd.factorize(s)
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+
+    best, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+        count = int(parsed.notna().sum())
+        if count > best_count:
+            best, best_count = parsed, count
+            if count == len(text):
+                break
+    if best is None:
+        return None
+
+    days = best.to_numpy(dtype="datetime64[s]")
+    result = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[s]")
+    valid = codes >= 0
+    result[valid] = days[codes[valid]]
+    df[col] = result
+
+    if parse_errors is not None:
+        failed = valid & np.isnat(result)
+        failed[valid] &= text.to_numpy(dtype=object)[codes[valid]] != ""
+        parse_errors[col] = s[failed]
+    return col
+
+
+# === VERİ KALİTESİ KONTROLLERİ ===
+
+def is_blank(series: pd.Series) -> pd.Series:
+    """
+    Boş / NaN değerleri yakalar. astype(str) sonrası 'nan' olmuş hücreler de boş sayılır.
+    """
+    s_str = series.astype(str).str.strip()
+    return series.isna() | s_str.eq("") | s_str.str.lower().eq("nan")
+
+
+def get_sales_quality_masks(df: pd.DataFrame, parse_errors: dict | None = None) -> dict:
+    """
+    Ana satış datası için kural adı -> hatalı satır maskesi sözlüğü döner.
+    Tüm kontroller kolon bazında (vektörel) yapılır.
+    """
+    parse_errors = parse_errors or {}
+    masks = {}
+
+    if QTY_COL in df.columns:
+        masks["Adet sıfır veya negatif"] = df[QTY_COL] <= 0
+
+    for col in (QTY_COL, REVENUE_COL):
+        if col in parse_errors:
+            masks[f"{col} sayıya çevrilemedi"] = df.index.isin(parse_errors[col].index)
+
+    date_col = find_date_column(df)
+    if date_col in parse_errors:
+        masks[f"{date_col} tarihe çevrilemedi"] = df.index.isin(parse_errors[date_col].index)
+
+    if ORG_COL in df.columns:
+        masks["Bilinmeyen OrganizationCode"] = df[ORG_COL].isna()
+
+    if BRAND_COL in df.columns:
+        masks["Marka boş"] = is_blank(df[BRAND_COL])
+
+    if STORE_COL in df.columns:
+        masks["Mağaza boş"] = is_blank(df[STORE_COL])
+
+    masks["Tekrarlanan satır"] = df.duplicated(keep="first")
+    return masks
+
+
+def get_giftcard_quality_masks(df: pd.DataFrame, parse_errors: dict | None = None) -> dict:
+    """
+    Gift card datası için kural adı -> hatalı satır maskesi sözlüğü döner.
+    """
+    parse_errors = parse_errors or {}
+    masks = {}
+    if df is None or df.empty:
+        return masks
+
+    if GC_QTY_COL in df.columns:
+        masks["Adet sıfır veya negatif"] = df[GC_QTY_COL] <= 0
+
+    for col in (GC_QTY_COL, GC_INVOICE_COL, GC_DISC_COL):
+        if col in parse_errors:
+            masks[f"{col} sayıya çevrilemedi"] = df.index.isin(parse_errors[col].index)
+
+    if GC_PRODUCT_COL in df.columns:
+        masks["Ürün adı boş"] = is_blank(df[GC_PRODUCT_COL])
+
+    masks["Tekrarlanan satır"] = df.duplicated(keep="first")
+    return masks
+
+
+def write_quarantine(df: pd.DataFrame, flags: np.ndarray, rule_names: list[str],
+                     parse_errors: dict, path: str, append: bool = False) -> int:
+    """
+    En az bir kurala takılan satırları, takıldığı kurallarla birlikte
+    QUARANTINE_CHUNK_ROWS'luk parçalar halinde CSV'ye ekleyerek yazar
+    (tüm hatalı satırlar aynı anda kopyalanmaz). Sayıya çevrilemeyen
+    hücrelerin ham değerleri geri yazılır. append=True ise dosya baştan
+    yazılmaz, sona eklenir. Yazılan satır sayısını döner.
+    """
+    positions = np.flatnonzero(flags)
+    if len(positions) == 0:
+        return 0
+
+    # Aynı kural kombinasyonu çok tekrar eder: etiketler benzersiz bit maskeleri için bir kez üretilir
+    codes = flags[positions]
+    labels = {
+        code: " | ".join(name for bit, name in enumerate(rule_names) if code >> bit & 1)
+        for code in np.unique(codes).tolist()
+    }
+
+    for start in range(0, len(positions), QUARANTINE_CHUNK_ROWS):
+        chunk_pos = positions[start:start + QUARANTINE_CHUNK_ROWS]
+        chunk = df.iloc[chunk_pos].copy()
+
+        for col, raw in parse_errors.items():
+            hit = raw.index.intersection(chunk.index)
+            if len(hit):
+                chunk[col] = chunk[col].astype(object)
+                chunk.loc[hit, col] = raw.loc[hit]
+
+        chunk["Hata_Kurallari"] = [labels[c] for c in codes[start:start + QUARANTINE_CHUNK_ROWS].tolist()]
+        first = start == 0 and not (append and os.path.exists(path))
+        chunk.to_csv(path, sep=";", index=False, encoding="utf-8-sig" if first else "utf-8",
+                     mode="w" if first else "a", header=first)
+
+    return len(positions)
+
+
+def check_data_quality(df: pd.DataFrame, masks: dict, source: str,
+                       parse_errors: dict | None = None,
+                       quarantine_file: str | None = None,
+                       append: bool = False) -> pd.DataFrame:
+    """
+    Kalite kurallarını uygular, kural başına hatalı satır sayısını döner ve
+    quarantine_file verilmişse hatalı satırları karantina CSV'sine yazar.
+    Dönüş kolonları: Kaynak, Kural, Satir_Sayisi
+    """
+    rule_names = list(masks)
+    flags = np.zeros(len(df), dtype=np.int64)
+    rows = []
+
+    for bit, name in enumerate(rule_names):
+        mask = np.asarray(masks[name], dtype=bool)
+        flags |= mask.astype(np.int64) << bit
+        rows.append({"Kaynak": source, "Kural": name, "Satir_Sayisi": int(mask.sum())})
+
+    if quarantine_file:
+        n = write_quarantine(df, flags, rule_names, parse_errors or {}, quarantine_file, append)
+        if n and not append:
+            print(f"⚠️ {source}: {n:,} satır en az bir kalite kuralına takıldı → {quarantine_file}")
+
+    return pd.DataFrame(rows, columns=["Kaynak", "Kural", "Satir_Sayisi"])
+
+
 # === DATAFRAME ÜRETEN YARDIMCI FONKSİYONLAR (EXCEL İÇİN DE KULLANILACAK) ===
 
 def get_total_df(df: pd.DataFrame) -> pd.DataFrame:
@@ -186,7 +909,7 @@ def get_total_df(df: pd.DataFrame) -> pd.DataFrame:
 
 def get_category_df(df: pd.DataFrame) -> pd.DataFrame:
     return (
-        df.groupby(CATEGORY_COL)
+        df.groupby(CATEGORY_COL, observed=True)
           .agg(
               Toplam_Adet=(QTY_COL, "sum"),
               Toplam_Ciro=(REVENUE_COL, "sum")
@@ -198,7 +921,7 @@ def get_category_df(df: pd.DataFrame) -> pd.DataFrame:
 
 def get_brand_top10_df(df: pd.DataFrame) -> pd.DataFrame:
     return (
-        df.groupby(BRAND_COL)
+        df.groupby(BRAND_COL, observed=True)
           .agg(
               Toplam_Adet=(QTY_COL, "sum"),
               Toplam_Ciro=(REVENUE_COL, "sum")
@@ -214,7 +937,7 @@ def get_brand_all_df(df: pd.DataFrame) -> pd.DataFrame:
     Ciroya göre büyükten küçüğe sıralanır.
     """
     return (
-        df.groupby(BRAND_COL)
+        df.groupby(BRAND_COL, observed=True)
           .agg(
               Toplam_Adet=(QTY_COL, "sum"),
               Toplam_Ciro=(REVENUE_COL, "sum")
@@ -229,7 +952,7 @@ def get_store_online_offline_df(df: pd.DataFrame):
     offline_df = df[~mask_online]
 
     online_result = (
-        online_df.groupby(STORE_COL)
+        online_df.groupby(STORE_COL, observed=True)
                  .agg(
                      Toplam_Adet=(QTY_COL, "sum"),
                      Toplam_Ciro=(REVENUE_COL, "sum")
@@ -240,7 +963,7 @@ def get_store_online_offline_df(df: pd.DataFrame):
     )
 
     offline_result = (
-        offline_df.groupby(STORE_COL)
+        offline_df.groupby(STORE_COL, observed=True)
                   .agg(
                       Toplam_Adet=(QTY_COL, "sum"),
                       Toplam_Ciro=(REVENUE_COL, "sum")
@@ -263,7 +986,7 @@ def get_store_online_offline_all_df(df: pd.DataFrame):
     offline_df = df[~mask_online]
 
     online_result = (
-        online_df.groupby(STORE_COL)
+        online_df.groupby(STORE_COL, observed=True)
                  .agg(
                      Toplam_Adet=(QTY_COL, "sum"),
                      Toplam_Ciro=(REVENUE_COL, "sum")
@@ -273,7 +996,7 @@ def get_store_online_offline_all_df(df: pd.DataFrame):
     )
 
     offline_result = (
-        offline_df.groupby(STORE_COL)
+        offline_df.groupby(STORE_COL, observed=True)
                   .agg(
                       Toplam_Adet=(QTY_COL, "sum"),
                       Toplam_Ciro=(REVENUE_COL, "sum")
@@ -343,7 +1066,7 @@ def get_renewed_by_category_df(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     return (
-        renewed_df.groupby(category_col)
+        renewed_df.groupby(category_col, observed=True)
                   .agg(
                       Toplam_Adet=(QTY_COL, "sum"),
                       Toplam_Ciro=(REVENUE_COL, "sum")
@@ -359,7 +1082,7 @@ def get_top_products_df(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     return (
-        df.groupby(PRODUCT_COL)
+        df.groupby(PRODUCT_COL, observed=True)
           .agg(
               Toplam_Adet=(QTY_COL, "sum"),
               Toplam_Ciro=(REVENUE_COL, "sum")
@@ -379,7 +1102,7 @@ def get_top_products_top50_df(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     return (
-        df.groupby(PRODUCT_COL)
+        df.groupby(PRODUCT_COL, observed=True)
           .agg(
               Toplam_Adet=(QTY_COL, "sum"),
               Toplam_Ciro=(REVENUE_COL, "sum")
@@ -390,6 +1113,144 @@ def get_top_products_top50_df(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
+def get_product_totals_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ana datadaki TÜM ürünler (Uzun Tanım) için adet ve ciro özetini döner.
+    Adet bazında büyükten küçüğe sıralar, kırpma (head) yapmaz.
+    """
+    if PRODUCT_COL not in df.columns:
+        return pd.DataFrame()
+
+    return (
+        df.groupby(PRODUCT_COL, observed=True)
+          .agg(
+              Toplam_Adet=(QTY_COL, "sum"),
+              Toplam_Ciro=(REVENUE_COL, "sum")
+          )
+          .reset_index()
+          .sort_values("Toplam_Adet", ascending=False)
+    )
+
+
+def get_unit_price_stats_df(df: pd.DataFrame, group_col: str) -> pd.DataFrame:
+    """
+    Birim fiyat (KDV dahil ciro / Sipariş Miktarı) dağılımını group_col
+    (Uzun Tanım veya Marka) bazında özetler.
+    - Sadece adedi 0'dan büyük satırlar kullanılır (0 adet -> bölme hatası,
+      negatif adet -> iade satırı)
+    - Ortalama birim fiyat adet ağırlıklıdır: toplam ciro / toplam adet
+    - Medyan ve yüzdelikler satır bazında birim fiyatlardan, np.percentile
+      ile aynı (lineer) yöntemle hesaplanır
+    Grup başına apply yerine tek sıralama + grup başlangıç indeksleri kullanılır.
+    Toplam ciroya göre büyükten küçüğe sıralanır.
+    """
+    pct_cols = [name for _, name in PRICE_PERCENTILES]
+    columns = [group_col, "Satir_Sayisi", "Toplam_Adet", "Toplam_Ciro",
+               "Ortalama_Birim_Fiyat", "Min_Birim_Fiyat", *pct_cols, "Max_Birim_Fiyat"]
+    if group_col not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    valid = (df[QTY_COL] > 0) & df[group_col].notna()
+    if not valid.any():
+        return pd.DataFrame(columns=columns)
+
+    qty = df.loc[valid, QTY_COL].to_numpy(dtype="float64")
+    revenue = df.loc[valid, REVENUE_COL].to_numpy(dtype="float64")
+    codes, groups = pd.factorize(df.loc[valid, group_col])
+    price = revenue / qty
+
+    # Önce gruba, grup içinde fiyata göre sırala: her grubun fiyatları ardışık ve sıralı olur
+    order = np.lexsort((price, codes))
+    sorted_price = price[order]
+    counts = np.bincount(codes, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def percentile(q: float) -> np.ndarray:
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        return sorted_price[lo] + (sorted_price[hi] - sorted_price[lo]) * (pos - lo)
+
+    qty_sum = np.bincount(codes, weights=qty, minlength=len(groups))
+    revenue_sum = np.bincount(codes, weights=revenue, minlength=len(groups))
+
+    result = pd.DataFrame({
+        group_col: groups,
+        "Satir_Sayisi": counts,
+        "Toplam_Adet": qty_sum,
+        "Toplam_Ciro": revenue_sum,
+        "Ortalama_Birim_Fiyat": revenue_sum / qty_sum,
+        "Min_Birim_Fiyat": sorted_price[starts],
+    })
+    for q, name in PRICE_PERCENTILES:
+        result[name] = percentile(q)
+    result["Max_Birim_Fiyat"] = sorted_price[starts + counts - 1]
+
+    return result.sort_values("Toplam_Ciro", ascending=False)[columns]
+
+
+def get_daily_channel_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gün x kanal tablosu: her gün için Online / Fiziksel ve toplam adet & ciro.
+    Günlük gruplama (resample) tek groupby ile yapılır; satış olmayan günler
+    ilk ve son gün arasında 0 ile doldurulur. Kanal kuralı get_channels_df ile
+    aynıdır; Toplam kolonları kanalı bilinmeyen satırları da içerir.
+    """
+    columns = ["Gun", "Online_Adet", "Online_Ciro", "Fiziksel_Adet", "Fiziksel_Ciro",
+               "Toplam_Adet", "Toplam_Ciro"]
+    date_col = find_date_column(df)
+    if date_col is None or not pd.api.types.is_datetime64_any_dtype(df[date_col]) or df[date_col].isna().all():
+        return pd.DataFrame(columns=columns)
+
+    dated = df[df[date_col].notna()]
+    day = pd.Grouper(key=date_col, freq="D")
+    channel = get_channel_labels(dated).rename("Kanal")
+
+    by_channel = (
+        dated.groupby([day, channel])[[QTY_COL, REVENUE_COL]].sum()
+             .unstack("Kanal", fill_value=0)
+    )
+    total = dated.groupby(day)[[QTY_COL, REVENUE_COL]].sum()
+
+    result = pd.DataFrame(index=total.index)
+    for name in ("Online", "Fiziksel"):
+        for src, dst in ((QTY_COL, "Adet"), (REVENUE_COL, "Ciro")):
+            result[f"{name}_{dst}"] = by_channel[(src, name)] if (src, name) in by_channel.columns else 0.0
+    result["Toplam_Adet"] = total[QTY_COL]
+    result["Toplam_Ciro"] = total[REVENUE_COL]
+
+    result = result.fillna(0).rename_axis("Gun").reset_index()
+    return result[columns]
+
+
+def get_daily_category_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gün x kategori (Kategori2) tablosu: her gün ve kategori için adet & ciro.
+    Satış olmayan gün / kategori kombinasyonları 0 olarak yer alır.
+    """
+    columns = ["Gun", CATEGORY_COL, "Toplam_Adet", "Toplam_Ciro"]
+    date_col = find_date_column(df)
+    if (date_col is None or CATEGORY_COL not in df.columns
+            or not pd.api.types.is_datetime64_any_dtype(df[date_col]) or df[date_col].isna().all()):
+        return pd.DataFrame(columns=columns)
+
+    dated = df[df[date_col].notna()]
+    agg = dated.groupby([pd.Grouper(key=date_col, freq="D"), CATEGORY_COL],
+                        observed=True)[[QTY_COL, REVENUE_COL]].sum()
+
+    days = pd.date_range(dated[date_col].min().normalize(), dated[date_col].max().normalize(), freq="D")
+    categories = agg.index.get_level_values(CATEGORY_COL).unique()
+    full = pd.MultiIndex.from_product([days, categories], names=["Gun", CATEGORY_COL])
+
+    result = (
+        agg.rename_axis(["Gun", CATEGORY_COL])
+           .reindex(full, fill_value=0)
+           .rename(columns={QTY_COL: "Toplam_Adet", REVENUE_COL: "Toplam_Ciro"})
+           .reset_index()
+    )
+    return result[columns]
+
+
 def get_giftcard_products_df(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
@@ -411,6 +1272,108 @@ def get_giftcard_products_df(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
+def normalize_product_keys(names: pd.Series) -> pd.Series:
+    """
+    Ürün adlarını eşleştirme anahtarına çevirir: Türkçe karakterler ASCII'ye
+    indirilir, küçük harfe çevrilir, harf/rakam dışı her şey tek boşluk olur.
+    ("Apple  iPhone-15 ŞARJ" -> "apple iphone 15 sarj")
+    Normalizasyon sadece farklı değerler üzerinde yapılır, satırlara kodla dağıtılır.
+    """
+    codes, uniques = pd.factorize(names)
+    keys = (
+        pd.Series(uniques.astype(str))
+          .str.translate(TR_ASCII_TABLE)
+          .str.lower()
+          .str.replace(r"[^0-9a-z]+", " ", regex=True)
+          .str.strip()
+          .to_numpy(dtype=object)
+    )
+    result = np.empty(len(codes), dtype=object)
+    valid = codes >= 0
+    result[valid] = keys[codes[valid]]
+    result[~valid] = None
+    return pd.Series(result, index=names.index)
+
+
+def aggregate_by_key(keys: pd.Series, names: pd.Series, values: dict) -> pd.DataFrame:
+    """
+    Normalize anahtar bazında toplam alır (bincount ile). Boş anahtarlar atlanır.
+    Her anahtar için ilk görülen orijinal ad 'Ad' kolonunda tutulur.
+    values: {çıktı_kolonu: sayısal Series}
+    """
+    codes, uniques = pd.factorize(keys)
+    valid = codes >= 0
+    codes = codes[valid]
+    n = len(uniques)
+
+    first_pos = np.full(n, len(codes), dtype=np.int64)
+    np.minimum.at(first_pos, codes, np.arange(len(codes)))
+
+    result = pd.DataFrame({
+        "Anahtar": uniques,
+        "Ad": names.to_numpy()[valid][first_pos] if n else [],
+    })
+    for col, series in values.items():
+        result[col] = np.bincount(codes, weights=series.to_numpy(dtype="float64")[valid], minlength=n)
+    return result
+
+
+def get_giftcard_reconciliation_df(df: pd.DataFrame, df_gc: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gift card datasındaki ürünleri (MALZEME TANIMI) satış datasındaki ürünlerle
+    (Uzun Tanım) normalize ad anahtarı üzerinden eşleştirir ve adet / net tutar
+    farklarını döner. Net tutar = FATURA_TUTARI - INDIRIM_TUTARI, satış tarafında
+    KDV dahil ciro ile karşılaştırılır.
+    - Her iki taraf önce anahtar bazında toplanır, eşleştirme satış anahtarları
+      üzerine kurulan hash index ile (Index.get_indexer) tek seferde yapılır.
+    - Durum: Uyumlu / Adet farkı / Tutar farkı / Adet ve tutar farkı / Satışta yok
+    Mutlak tutar farkına göre büyükten küçüğe sıralanır.
+    """
+    columns = ["Urun", "Durum", "GC_Adet", "GC_Net_Tutar", "Satis_Adet", "Satis_Ciro",
+               "Adet_Farki", "Tutar_Farki"]
+    required = [GC_PRODUCT_COL, GC_QTY_COL, GC_INVOICE_COL, GC_DISC_COL]
+    if (df_gc is None or df_gc.empty or any(c not in df_gc.columns for c in required)
+            or PRODUCT_COL not in df.columns):
+        return pd.DataFrame(columns=columns)
+
+    gc = aggregate_by_key(
+        normalize_product_keys(df_gc[GC_PRODUCT_COL]),
+        df_gc[GC_PRODUCT_COL],
+        {
+            "GC_Adet": df_gc[GC_QTY_COL],
+            "GC_Net_Tutar": df_gc[GC_INVOICE_COL] - df_gc[GC_DISC_COL],
+        },
+    )
+    sales = aggregate_by_key(
+        normalize_product_keys(df[PRODUCT_COL]),
+        df[PRODUCT_COL],
+        {"Satis_Adet": df[QTY_COL], "Satis_Ciro": df[REVENUE_COL]},
+    )
+
+    match = pd.Index(sales["Anahtar"]).get_indexer(gc["Anahtar"])
+    found = match >= 0
+
+    result = pd.DataFrame({"Urun": gc["Ad"], "GC_Adet": gc["GC_Adet"], "GC_Net_Tutar": gc["GC_Net_Tutar"]})
+    for col in ("Satis_Adet", "Satis_Ciro"):
+        values = np.full(len(gc), np.nan)
+        values[found] = sales[col].to_numpy()[match[found]]
+        result[col] = values
+
+    result["Adet_Farki"] = result["GC_Adet"] - result["Satis_Adet"]
+    result["Tutar_Farki"] = result["GC_Net_Tutar"] - result["Satis_Ciro"]
+
+    qty_diff = result["Adet_Farki"].abs().to_numpy() > RECON_QTY_TOLERANCE
+    amount_diff = result["Tutar_Farki"].abs().to_numpy() > RECON_AMOUNT_TOLERANCE
+    result["Durum"] = np.select(
+        [~found, qty_diff & amount_diff, qty_diff, amount_diff],
+        ["Satışta yok", "Adet ve tutar farkı", "Adet farkı", "Tutar farkı"],
+        default="Uyumlu",
+    )
+
+    order = np.argsort(-result["Tutar_Farki"].abs().fillna(np.inf).to_numpy(), kind="stable")
+    return result.iloc[order][columns].reset_index(drop=True)
+
+
 # === EKRANA YAZAN FONKSİYONLAR (ARTIK YUKARIDAKİ DF FONKSİYONLARINI KULLANIYOR) ===
 
 def print_total(df: pd.DataFrame):
@@ -526,54 +1489,210 @@ def print_giftcard_products(df: pd.DataFrame):
     print("-" * 60)
 
 
-# === ÜRÜN ARAMA ===
-
-def query_product(df: pd.DataFrame, search: str):
+def print_giftcard_reconciliation(df: pd.DataFrame, df_gc: pd.DataFrame):
     """
-    Ana satış datasında 'Uzun Tanım' sütununda geçen metne göre
-    ürünleri filtreler ve adet + ciro toplamını gösterir.
-    Arama case-insensitive ve kısmi eşleşme ile yapılır.
+    Gift card ürünlerinin satış datasıyla mutabakat özetini (durum bazında
+    ürün sayıları ve en büyük 10 tutar farkı) gösterir.
     """
-    print(f"\n🔍 Arama: '{search}'")
+    print("\n9) GIFT CARD - SATIŞ MUTABAKATI")
 
-    if PRODUCT_COL not in df.columns:
-        print(f"{PRODUCT_COL} sütunu bulunamadı, ürün bazlı arama yapılamıyor.")
+    result = get_giftcard_reconciliation_df(df, df_gc)
+    if result.empty:
+        print("Gift card datası boş veya eksik sütunlu, mutabakat yapılamadı.")
         print("-" * 60)
         return
 
-    # Arama filtresi (case-insensitive, kısmi eşleşme)
-    mask = df[PRODUCT_COL].astype(str).str.contains(search, case=False, na=False)
-    sub = df[mask]
+    print(result["Durum"].value_counts().rename_axis("Durum").reset_index(name="Urun_Sayisi")
+          .to_string(index=False))
 
-    if sub.empty:
-        print("Bu arama ile eşleşen ürün bulunamadı.")
+    mismatches = result[result["Durum"] != "Uyumlu"]
+    if not mismatches.empty:
+        print("\nEn büyük 10 fark:")
+        print(mismatches.head(10).to_string(index=False))
+    print("-" * 60)
+
+
+def print_daily_trend(df: pd.DataFrame):
+    """
+    Gün bazında Online / Fiziksel / toplam adet ve ciroyu gösterir.
+    """
+    print("\n10) GÜNLÜK TREND (KANAL BAZLI)")
+
+    result = get_daily_channel_df(df)
+    if result.empty:
+        print("Datada okunabilir tarih sütunu bulunamadı, günlük kırılım yapılamadı.")
         print("-" * 60)
         return
 
-    # Her bir "Uzun Tanım" için toplam adet ve ciro
-    result = (
-        sub.groupby(PRODUCT_COL)
-           .agg(
-               Toplam_Adet=(QTY_COL, "sum"),
-               Toplam_Ciro=(REVENUE_COL, "sum")
-           )
-           .reset_index()
-           .sort_values("Toplam_Adet", ascending=False)
-    )
-
+    result = result.assign(Gun=result["Gun"].dt.strftime("%d.%m.%Y"))
     print(result.to_string(index=False))
     print("-" * 60)
 
 
-def interactive_product_lookup(df: pd.DataFrame):
-    """
+# === ÜRÜN ARAMA ===
+
+def get_trigrams(text: str) -> set:
+    """
+    Metni küçük harfe çevirip kelimelere böler ve her kelimeyi
+    başına iki, sonuna bir boşluk ekleyerek 3'lü karakter gruplarına ayırır.
+    (pg_trgm ile aynı mantık: "iphone" -> "  i", " ip", "iph", ..., "ne ")
+    """
+    trigrams = set()
+    for word in re.sub(r"[^\w]+", " ", str(text).casefold()).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            trigrams.add(padded[i:i + 3])
+    return trigrams
+
+
+def build_product_index(df: pd.DataFrame) -> dict:
+    """
+    Farklı ürün adları (Uzun Tanım) üzerinde trigram indeksi kurar.
+    Ürünler Toplam_Adet'e göre azalan sırada numaralanır; böylece
+    benzerlik eşitliğinde küçük ürün numarası = daha çok satan ürün olur.
+
+    İndeks CSR düzeninde tutulur: trigram_id için ürünler
+    postings[offsets[trigram_id]:offsets[trigram_id + 1]] aralığındadır.
+    """
+    products = get_product_totals_df(df).reset_index(drop=True)
+    names = products[PRODUCT_COL].astype(str).to_numpy() if not products.empty else np.array([], dtype=object)
+
+    vocab = {}
+    word_trigrams = {}   # ürün adlarında kelimeler çok tekrar eder, trigramlar kelime başına bir kez çıkarılır
+    tri_ids = []
+    prod_ids = []
+    for i, name in enumerate(names):
+        ids = set()
+        for word in re.sub(r"[^\w]+", " ", name.casefold()).split():
+            w_ids = word_trigrams.get(word)
+            if w_ids is None:
+                w_ids = [vocab.setdefault(tri, len(vocab)) for tri in get_trigrams(word)]
+                word_trigrams[word] = w_ids
+            ids.update(w_ids)
+        tri_ids.extend(ids)
+        prod_ids.extend([i] * len(ids))
+
+    tri_ids = np.asarray(tri_ids, dtype=np.int64)
+    prod_ids = np.asarray(prod_ids, dtype=np.int32)
+
+    order = np.argsort(tri_ids, kind="stable")
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(tri_ids, minlength=len(vocab)))
+
+    return {
+        "products": products,
+        "vocab": vocab,
+        "offsets": offsets,
+        "postings": prod_ids[order],
+        "cache": OrderedDict(),
+    }
+
+
+def fuzzy_search_products(index: dict, search: str, limit: int = FUZZY_RESULT_LIMIT) -> pd.DataFrame:
+    """
+    Trigram indeksi üzerinden yazım hatalarına dayanıklı ürün araması yapar.
+    Benzerlik = aramadaki trigramlardan üründe de geçenlerin oranı.
+    Sonuçlar benzerliğe, eşitlikte Toplam_Adet'e göre azalan sıralanır.
+    Son FUZZY_CACHE_SIZE sorgunun sonucu LRU cache'te tutulur.
+    """
+    cache = index["cache"]
+    key = (search.casefold().strip(), limit)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    products = index["products"]
+    columns = [PRODUCT_COL, "Benzerlik", "Toplam_Adet", "Toplam_Ciro"]
+    q_trigrams = get_trigrams(search)
+    tri_ids = [index["vocab"][t] for t in q_trigrams if t in index["vocab"]]
+
+    if not tri_ids:
+        result = pd.DataFrame(columns=columns)
+    else:
+        offsets = index["offsets"]
+        hits = np.concatenate([index["postings"][offsets[t]:offsets[t + 1]] for t in tri_ids])
+        shared = np.bincount(hits, minlength=len(products))
+
+        min_shared = max(1, int(np.ceil(FUZZY_MIN_SIMILARITY * len(q_trigrams))))
+        candidates = np.flatnonzero(shared >= min_shared)
+
+        # Tek anahtarda sıralama: önce ortak trigram sayısı, eşitlikte ürün numarası (adet sırası)
+        rank_key = shared[candidates].astype(np.int64) * len(products) - candidates
+        if len(candidates) > limit:
+            top = np.argpartition(-rank_key, limit)[:limit]
+            candidates, rank_key = candidates[top], rank_key[top]
+        best = candidates[np.argsort(-rank_key)]
+
+        result = products.iloc[best].copy()
+        result.insert(1, "Benzerlik", (shared[best] / len(q_trigrams)).round(3))
+        result = result[columns].reset_index(drop=True)
+
+    cache[key] = result
+    if len(cache) > FUZZY_CACHE_SIZE:
+        cache.popitem(last=False)
+    return result
+
+
+def query_product(df: pd.DataFrame, search: str, index: dict | None = None):
+    """
+    Ana satış datasında 'Uzun Tanım' sütununda geçen metne göre
+    ürünleri filtreler ve adet + ciro toplamını gösterir.
+    Arama case-insensitive ve kısmi eşleşme ile yapılır.
+    Eşleşme yoksa ve trigram indeksi verilmişse benzer ürünler önerilir.
+    """
+    print(f"\n🔍 Arama: '{search}'")
+
+    if PRODUCT_COL not in df.columns:
+        print(f"{PRODUCT_COL} sütunu bulunamadı, ürün bazlı arama yapılamıyor.")
+        print("-" * 60)
+        return
+
+    # Arama filtresi (case-insensitive, kısmi eşleşme)
+    mask = df[PRODUCT_COL].astype(str).str.contains(search, case=False, na=False)
+    sub = df[mask]
+
+    if sub.empty:
+        print("Bu arama ile eşleşen ürün bulunamadı.")
+        if index is not None:
+            suggestions = fuzzy_search_products(index, search)
+            if not suggestions.empty:
+                print("\nBunu mu demek istediniz? (benzerliğe göre sıralı)")
+                print(suggestions.to_string(index=False))
+        print("-" * 60)
+        return
+
+    # Her bir "Uzun Tanım" için toplam adet ve ciro
+    result = (
+        sub.groupby(PRODUCT_COL, observed=True)
+           .agg(
+               Toplam_Adet=(QTY_COL, "sum"),
+               Toplam_Ciro=(REVENUE_COL, "sum")
+           )
+           .reset_index()
+           .sort_values("Toplam_Adet", ascending=False)
+    )
+
+    print(result.to_string(index=False))
+    print("-" * 60)
+
+
+def interactive_product_lookup(df: pd.DataFrame):
+    """
     Konsolda kullanıcıdan ürün adı alarak tekrar tekrar arama yapmayı sağlar.
     Enter'a basarak çıkılabilir.
     """
-    print("\n9) ÜRÜN BAZLI HIZLI SORGULAMA MODU")
+    print("\n11) ÜRÜN BAZLI HIZLI SORGULAMA MODU")
     print("Belirli bir ürün için adet & ciro görmek istersen ürün adından bir parça yaz.")
     print("Çıkmak için hiçbir şey yazmadan Enter'a bas.\n")
 
+    # Trigram indeksi ilk sorudan önce bir kez kurulur; böylece ilk arama da
+    # sonraki aramalar kadar hızlı döner
+    index = None
+    if PRODUCT_COL in df.columns:
+        started = time.perf_counter()
+        index = build_product_index(df)
+        print(f"🔎 Ürün indeksi hazır ({time.perf_counter() - started:.1f} sn).\n")
+
     while True:
         try:
             search = input("→ Ürün adı/ifade gir (veya Enter ile çık): ").strip()
@@ -588,28 +1707,683 @@ def interactive_product_lookup(df: pd.DataFrame):
             print("-" * 60)
             break
 
-        query_product(df, search)
+        query_product(df, search, index)
+
+
+# === TOPLU ÜRÜN SORGULAMA (AHO-CORASICK) ===
+
+def read_search_terms(path: str) -> list[str]:
+    """
+    Arama ifadelerini dosyadan okur: her satırda bir ifade.
+    Boş satırlar ve tekrar eden ifadeler (büyük/küçük harf farkı gözetmeden) atlanır,
+    dosyadaki sıra korunur.
+    """
+    terms = []
+    seen = set()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            term = line.strip()
+            key = term.casefold()
+            if not term or key in seen:
+                continue
+            seen.add(key)
+            terms.append(term)
+    return terms
+
+
+def build_aho_corasick(patterns: list[str]):
+    """
+    Verilen kalıplar için Aho-Corasick otomatı kurar.
+    Dönüş: (goto, fail, output)
+      goto[state]   : {karakter: sonraki_state}
+      fail[state]   : eşleşme bozulunca düşülecek state
+      output[state] : bu state'e gelindiğinde biten kalıp indeksleri
+    """
+    goto = [{}]
+    fail = [0]
+    output = [set()]
+
+    for idx, pattern in enumerate(patterns):
+        state = 0
+        for ch in pattern:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                fail.append(0)
+                output.append(set())
+            state = nxt
+        output[state].add(idx)
+
+    # BFS ile fail linklerini kur, çıktıları fail zincirinden devral
+    queue = list(goto[0].values())
+    head = 0
+    while head < len(queue):
+        state = queue[head]
+        head += 1
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            output[nxt] |= output[fail[nxt]]
+
+    return goto, fail, output
+
+
+def match_aho_corasick(automaton, text: str) -> set:
+    """
+    Metni otomattan tek geçişte geçirir ve içinde geçen kalıp indekslerini döner.
+    """
+    goto, fail, output = automaton
+    state = 0
+    found = set()
+    for ch in text:
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        if output[state]:
+            found |= output[state]
+    return found
+
+
+def get_batch_query_df(df: pd.DataFrame, terms: list[str]) -> pd.DataFrame:
+    """
+    Arama ifadelerinin hepsini, farklı ürün adları (Uzun Tanım) üzerinden
+    tek geçişte eşleştirir ve her ifade için eşleşen ürün sayısı ile
+    toplam adet / ciroyu döner. Eşleşme query_product gibi
+    büyük/küçük harf duyarsız ve kısmi (literal) yapılır.
+    """
+    columns = ["Arama", "Eslesen_Urun_Sayisi", "Toplam_Adet", "Toplam_Ciro"]
+    if PRODUCT_COL not in df.columns or not terms:
+        return pd.DataFrame(columns=columns)
+
+    # Satırlar yerine farklı ürün adları taranır
+    products = get_product_totals_df(df)
+    automaton = build_aho_corasick([t.casefold() for t in terms])
+
+    term_idx = []
+    product_idx = []
+    for i, name in enumerate(products[PRODUCT_COL].astype(str)):
+        for t in match_aho_corasick(automaton, name.casefold()):
+            term_idx.append(t)
+            product_idx.append(i)
+
+    pairs = pd.DataFrame({
+        "term": term_idx,
+        "Toplam_Adet": products["Toplam_Adet"].to_numpy()[product_idx],
+        "Toplam_Ciro": products["Toplam_Ciro"].to_numpy()[product_idx],
+    })
+    totals = pairs.groupby("term").agg(
+        Eslesen_Urun_Sayisi=("Toplam_Adet", "size"),
+        Toplam_Adet=("Toplam_Adet", "sum"),
+        Toplam_Ciro=("Toplam_Ciro", "sum"),
+    )
+
+    result = pd.DataFrame({"Arama": terms}).join(totals)
+    result["Eslesen_Urun_Sayisi"] = result["Eslesen_Urun_Sayisi"].fillna(0).astype("int64")
+    result[["Toplam_Adet", "Toplam_Ciro"]] = result[["Toplam_Adet", "Toplam_Ciro"]].fillna(0)
+    return result[columns]
+
+
+def export_batch_query(df: pd.DataFrame, terms_path: str, output_file: str | None = None) -> str:
+    """
+    Dosyadaki arama ifadeleri için toplu sorguyu çalıştırır ve sonucu
+    .csv ise CSV olarak, değilse Excel (TopluSorgu sayfası) olarak yazar.
+    """
+    terms = read_search_terms(terms_path)
+    result = get_batch_query_df(df, terms)
+
+    if output_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = f"statvision_toplu_sorgu_{timestamp}.xlsx"
+
+    if output_file.lower().endswith(".csv"):
+        result.to_csv(output_file, sep=";", index=False, encoding="utf-8-sig")
+    else:
+        with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
+            result.to_excel(writer, sheet_name="TopluSorgu", index=False)
+            ws = writer.sheets["TopluSorgu"]
+            ws.set_column("A:A", 40)
+            ws.set_column("B:D", 20)
+            ws.freeze_panes(1, 1)
+
+    matched = int((result["Eslesen_Urun_Sayisi"] > 0).sum())
+    print(f"\n🔍 Toplu sorgu: {len(terms)} ifade, {matched} tanesi en az bir ürünle eşleşti.")
+    print(f"📄 Sonuç dosyası: {output_file}")
+    print("-" * 60)
+    return output_file
+
+
+# === SONUÇ ÖNBELLEĞİ (get_* ÇIKTILARI) ===
+
+def get_code_dependencies(fn) -> tuple[list, list[str]]:
+    """
+    Fonksiyonun kodunda (iç fonksiyonlar / lambdalar dahil) adı geçen modül
+    seviyesindeki fonksiyonları ve BÜYÜK_HARF ayar sabitlerini, çağrılan
+    fonksiyonların bağımlılıklarını da izleyerek (co_names üzerinden) toplar.
+    Dönüş: (fonksiyon listesi - fn dahil, sabit adları listesi)
+    """
+    functions = {}
+    constants = set()
+    pending = [fn]
+
+    while pending:
+        func = pending.pop()
+        qualname = f"{func.__module__}.{func.__qualname__}"
+        if qualname in functions:
+            continue
+        functions[qualname] = func
+
+        codes = [func.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(c for c in code.co_consts if inspect.iscode(c))
+            for name in code.co_names:
+                value = func.__globals__.get(name)
+                if inspect.isfunction(value):
+                    pending.append(value)
+                elif (func.__globals__ is fn.__globals__ and name.isupper()
+                      and not name.startswith("_") and name in func.__globals__):
+                    constants.add(name)
+
+    return [functions[q] for q in sorted(functions)], sorted(constants)
+
+
+def _config_repr(value) -> str:
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(_config_repr(v) for v in value)) + "}"
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda kv: repr(kv[0]))
+        return "{" + ", ".join(f"{_config_repr(k)}: {_config_repr(v)}" for k, v in items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_config_repr(v) for v in value) + "]"
+    return repr(value)
+
+
+def get_config_snapshot(names, module_globals: dict | None = None) -> str:
+    """
+    Verilen BÜYÜK_HARF ayar sabitlerinin (ONLINE_STORES, *_COL, PRICE_PERCENTILES,
+    RECON_*, TR_ASCII_TABLE, ...) güncel değerlerinin sıralı metin özeti.
+    """
+    module_globals = globals() if module_globals is None else module_globals
+    parts = []
+    for name in sorted(names):
+        value = module_globals.get(name)
+        if not isinstance(value, (str, int, float, bool, tuple, list, set, frozenset, dict, type(None))):
+            continue
+        parts.append(f"{name}={_config_repr(value)}")
+    return "\n".join(parts)
+
+
+class ResultCache:
+    """
+    get_* fonksiyonlarının çıktılarını içerik adresli olarak diskte saklar.
+    Anahtar = fonksiyon adı + sürüm etiketi (fonksiyonun, çağırdığı yardımcıların
+    ve kullandığı ayar sabitlerinin özeti, RESULT_CACHE_VERSION) + DataFrame argümanlarının veri parmak izi + diğer argümanlar.
+    Girdi datası ve fonksiyon değişmediyse sonuç hesaplanmadan diskten okunur;
+    sadece datası ya da kodu değişen bölümler yeniden hesaplanır.
+    İş parçacıklarından aynı anda çağrılabilir.
+    """
+
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fingerprints = {}    # id(df) -> (df, parmak izi); df referansı id tekrar kullanılmasın diye tutulur
+        self._sources = {}    # fonksiyon -> kaynak kodu özeti
+        self.hits = []
+        self.misses = []
+        self.seconds_saved = 0.0
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """
+        DataFrame'in kolon adları, tipleri ve satır içerikleri üzerinden özeti.
+        Aynı çalışmada aynı nesne için bir kez hesaplanır.
+        """
+        with self._lock:
+            cached = self._fingerprints.get(id(df))
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+        if len(df):
+            h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        digest = h.hexdigest()
+
+        with self._lock:
+            self._fingerprints[id(df)] = (df, digest)
+        return digest
+
+    def version(self, fn) -> str:
+        """
+        Fonksiyonun sürüm etiketi: RESULT_CACHE_VERSION + fonksiyonun ve
+        (co_names ile zincirleme) çağırdığı yardımcıların kaynak kodu + kullandığı
+        ayar sabitlerinin güncel değerleri. Sadece mantığı ya da ayarı değişen
+        bölümlerin anahtarı değişir; ilgisiz bir fonksiyonu düzenlemek önbelleği bozmaz.
+        """
+        functions, constants = get_code_dependencies(fn)
+        h = hashlib.blake2b(digest_size=8)
+        h.update(f"{RESULT_CACHE_VERSION}:{fn.__module__}.{fn.__qualname__}".encode("utf-8"))
+        for func in functions:
+            digest = self._sources.get(func)
+            if digest is None:
+                try:
+                    code = inspect.getsource(func).encode("utf-8")
+                except (OSError, TypeError):
+                    code = func.__code__.co_code
+                digest = hashlib.blake2b(code, digest_size=16).digest()
+                with self._lock:
+                    self._sources[func] = digest
+            h.update(f"{func.__module__}.{func.__qualname__}".encode("utf-8") + digest)
+        h.update(get_config_snapshot(constants, fn.__globals__).encode("utf-8"))
+        return h.hexdigest()
+
+    def key(self, fn, args: tuple) -> str:
+        parts = [fn.__name__, self.version(fn)]
+        for arg in args:
+            if isinstance(arg, pd.DataFrame):
+                parts.append(self.fingerprint(arg))
+            else:
+                parts.append(repr(arg))
+        return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=20).hexdigest()
+
+    def call(self, fn, *args, label: str | None = None, compute=None):
+        """
+        fn(*args) sonucunu önbellekten döner; yoksa hesaplayıp kaydeder.
+        compute verilirse hesaplama fn(*args) yerine compute() ile yapılır
+        (ör. aynı fonksiyonun süreç işçisinde çalıştırılması); compute
+        (sonuç, hesaplama_süresi_sn) döner, anahtar yine fn ve args'tır.
+        """
+        label = label or fn.__name__
+        path = os.path.join(self.cache_dir, f"{fn.__name__}-{self.key(fn, args)}.pkl")
+
+        if os.path.exists(path):
+            try:
+                entry = pd.read_pickle(path)
+                with self._lock:
+                    self.hits.append(label)
+                    self.seconds_saved += entry["sure_sn"]
+                os.utime(path)   # En son kullanılanlar temizlikte korunur
+                return entry["sonuc"]
+            except Exception:
+                pass   # Bozuk / yarım kayıt: yeniden hesaplanır
+
+        if compute is not None:
+            result, elapsed = compute()
+        else:
+            started = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - started
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        pd.to_pickle({"sonuc": result, "sure_sn": elapsed}, tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.misses.append(label)
+        return result
+
+    def prune(self, max_files: int = RESULT_CACHE_MAX_FILES):
+        """
+        Kayıt sayısı max_files'ı aşarsa en uzun süredir kullanılmayanları siler.
+        Aynı klasörü kullanan başka bir iş (watch modu) dosyayı önce silmişse atlanır.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        if len(entries) <= max_files:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def print_stats(self):
+        total = len(self.hits) + len(self.misses)
+        print(f"\n🗃️ Sonuç önbelleği: {total} bölümün {len(self.hits)} tanesi önbellekten okundu "
+              f"(~{self.seconds_saved:.2f} sn kazanıldı), {len(self.misses)} tanesi hesaplandı.")
+        if self.misses and self.hits:
+            print("Yeniden hesaplanan: " + ", ".join(sorted(self.misses)))
+        print("-" * 60)
+
+
+# === PAYLAŞILAN BELLEK (SALT OKUNUR ARROW FRAME) ===
+
+_ATTACHED_FRAMES = {}
+
+
+class SharedFrameRef:
+    """
+    Süreç işçilerine DataFrame yerine gönderilen küçük tutamaç.
+    Sadece Arrow dosyasının yolunu taşır; pickle maliyeti data boyutundan bağımsızdır.
+    """
+
+    def __init__(self, path: str, n_rows: int, size_mb: float):
+        self.path = path
+        self.n_rows = n_rows
+        self.size_mb = size_mb
+
+
+def publish_shared_frame(df: pd.DataFrame, directory: str | None = SHARED_FRAME_DIR) -> SharedFrameRef:
+    """
+    Temizlenmiş DataFrame'i bir kez sıkıştırmasız Arrow IPC dosyası olarak yazar
+    (Linux'ta /dev/shm, yani RAM üzerinde). İşçiler bu dosyayı memory-map ile
+    açtığından işletim sistemi sayfaları tüm süreçler arasında tek kopya paylaşılır.
+    Sayısal kolonlar NaN'ları null'a çevrilmeden yazılır; böylece okuma
+    tarafında numpy dizileri dosya tamponunun üzerine kopyasız oturur.
+    'pyarrow' paketi gerekir.
+    """
+    import pyarrow as pa
+
+    arrays = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind in "fiub":
+            arrays[str(col)] = pa.array(series.to_numpy(), from_pandas=False)
+        else:
+            arrays[str(col)] = pa.Array.from_pandas(series)
+    table = pa.table(arrays) if arrays else pa.table({})
+
+    fd, path = tempfile.mkstemp(prefix="statvision_paylasim_", suffix=".arrow", dir=directory)
+    os.close(fd)
+    try:
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except BaseException:
+        os.remove(path)   # Yarım yazılmış dosya /dev/shm'de RAM tutmasın
+        raise
+    return SharedFrameRef(path, len(df), os.path.getsize(path) / (1024 * 1024))
+
+
+def attach_shared_frame(ref: SharedFrameRef) -> pd.DataFrame:
+    """
+    Yayınlanmış Arrow dosyasını memory-map ile açıp DataFrame olarak döner.
+    Sayısal ve metin kolonları dosya tamponlarını kopyalamadan kullanır
+    (metinler pandas'ın Arrow tabanlı str tipiyle). Aynı süreçte bir kez açılır.
+    Dönen frame salt okunur kabul edilmelidir.
+    """
+    df = _ATTACHED_FRAMES.get(ref.path)
+    if df is None:
+        import pyarrow as pa
+
+        source = pa.memory_map(ref.path, "r")
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas(split_blocks=True, self_destruct=False)
+        _ATTACHED_FRAMES[ref.path] = df
+    return df
+
+
+def release_shared_frame(ref: SharedFrameRef):
+    """
+    Arrow dosyasını siler (tüm işçiler kapandıktan sonra çağrılmalı).
+    """
+    try:
+        os.remove(ref.path)
+    except OSError:
+        pass
+
+
+def get_private_memory_mb() -> float | None:
+    """
+    Sürecin kendine ait (paylaşılmayan, anonim) bellek kullanımı, MB.
+    Memory-map ile paylaşılan sayfalar dahil değildir. /proc olmayan
+    sistemlerde None döner.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_shared_section(fn, args: tuple) -> tuple:
+    """
+    Süreç işçisinde çalışır: SharedFrameRef argümanlarını paylaşılan frame'e
+    bağlayıp fn'i çağırır. Dönüş: (sonuç, hesaplama süresi sn, işçinin özel belleği MB)
+    """
+    local_args = [attach_shared_frame(a) if isinstance(a, SharedFrameRef) else a for a in args]
+    started = time.perf_counter()
+    result = fn(*local_args)
+    return result, time.perf_counter() - started, get_private_memory_mb()
+
+
+def run_sections_in_processes(tasks: dict, workers: int, cache: "ResultCache | None" = None) -> dict:
+    """
+    {ad: (fonksiyon, *argümanlar)} görevlerini süreç havuzunda çalıştırır.
+    DataFrame argümanları ilk ihtiyaç anında bir kez paylaşılan Arrow dosyasına
+    yazılır (tüm bölümler önbellekten gelirse hiç yazılmaz); işçilere sadece
+    tutamaç gider ve her işçi datayı kopyalamadan bağlanır. Böylece bellek
+    işçi sayısıyla çarpılmaz. İşçiler 'spawn' ile başlatılır (Windows'ta da
+    aynı davranış). Sonuçlar küçük özet tablolar olduğu için pickle ile döner.
+    SHARED_FRAME_DIR'deki paylaşım dosyaları hata / kesinti durumunda da
+    (try/finally) silinir.
+    """
+    shared = {}
+    worker_memory = []
+    lock = threading.Lock()
+
+    def share(df: pd.DataFrame) -> SharedFrameRef:
+        with lock:
+            if id(df) not in shared:
+                shared[id(df)] = publish_shared_frame(df)
+            return shared[id(df)]
+
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, len(tasks))) as waiters:
+
+            def compute(fn, args):
+                remote_args = tuple(share(a) if isinstance(a, pd.DataFrame) else a for a in args)
+                result, seconds, private_mb = pool.submit(run_shared_section, fn, remote_args).result()
+                if private_mb is not None:
+                    worker_memory.append(private_mb)
+                return result, seconds
+
+            if cache is None:
+                futures = {name: waiters.submit(lambda fn=fn, args=args: compute(fn, args)[0])
+                           for name, (fn, *args) in tasks.items()}
+            else:
+                futures = {
+                    name: waiters.submit(cache.call, fn, *args, label=name,
+                                         compute=lambda fn=fn, args=args: compute(fn, args))
+                    for name, (fn, *args) in tasks.items()
+                }
+            results = {name: future.result() for name, future in futures.items()}
+    finally:
+        for ref in shared.values():
+            release_shared_frame(ref)
+
+    if not shared:
+        return results
+    shared_mb = sum(ref.size_mb for ref in shared.values())
+    print(f"\n🧩 Paylaşılan bellek: {len(shared)} frame, toplam {shared_mb:,.1f} MB tek kopya; "
+          f"{workers} süreç işçisi"
+          + (f", işçi başına özel bellek en fazla {max(worker_memory):,.1f} MB." if worker_memory else "."))
+    print("-" * 60)
+    return results
 
 
 # === EXCEL RAPOR ÜRETİCİ ===
 
-def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_gift: int):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = f"statvision_report_{timestamp}.xlsx"
-
-    total_df = get_total_df(df)
-    category_df = get_category_df(df)
-    brand_top10_df = get_brand_top10_df(df)        # terminal için
-    brand_all_df = get_brand_all_df(df)            # Excel MarkaTotal için
-    store_online_top10_df, store_offline_top10_df = get_store_online_offline_df(df)   # terminal için
-    store_online_all_df, store_offline_all_df = get_store_online_offline_all_df(df)   # Excel için
-    channels_df = get_channels_df(df)              # sheet yok ama Summary için kullanıyoruz
-    renewed_summary_df = get_renewed_summary_df(df)
-    renewed_by_cat_df = get_renewed_by_category_df(df)
-    top_products_df = get_top_products_df(df)      # terminal için (Top10)
-    top_products50_df = get_top_products_top50_df(df)  # Excel ProductTotal için
-    giftcard_df = get_giftcard_products_df(df_gc)
+def write_table_sheets(workbook, writer, table_df: pd.DataFrame, sheet_name: str,
+                       title: str, subtitle: str, formats: dict, first_col_width: int = 60):
+    """
+    Bir tabloyu diğer sayfalarla aynı düzende (başlık, açıklama, kolon başlıkları)
+    satır satır Excel'e yazar. Workbook constant_memory modunda açıldığı için
+    satırlar yazıldıkça diske aktarılır, bellek kullanımı satır sayısından
+    bağımsızdır. Excel'in satır sınırı aşılırsa tablo sheet_name, sheet_name_2, ...
+    sayfalarına bölünür.
+    İlk kolon metin, adet/sayı kolonları tam sayı, diğerleri ondalık yazılır.
+    """
+    start_row = 3
+    rows_per_sheet = EXCEL_MAX_ROWS - (start_row + 1)
+    total = len(table_df)
+    n_sheets = max(1, -(-total // rows_per_sheet))
+    columns = list(table_df.columns)
+    last_col = max(len(columns) - 1, 1)
+
+    # iterrows yerine kolonlar bir kez Python listesine çevrilip zip ile gezilir.
+    # Sayısal olmayan kolonlar (ör. Durum) metin olarak yazılır.
+    text_values = table_df[columns[0]].astype(str).tolist() if total else []
+    number_values = [table_df[c].tolist() for c in columns[1:]] if total else [[] for _ in columns[1:]]
+    number_formats = [
+        None if not pd.api.types.is_numeric_dtype(table_df[c])
+        else formats["int"] if ("Adet" in c or "Sayisi" in c) else formats["dec"]
+        for c in columns[1:]
+    ]
+
+    for sheet_no in range(n_sheets):
+        name = sheet_name if sheet_no == 0 else f"{sheet_name}_{sheet_no + 1}"
+        ws = workbook.add_worksheet(name)
+        writer.sheets[name] = ws
+
+        lo = sheet_no * rows_per_sheet
+        hi = min(total, lo + rows_per_sheet)
+
+        ws.merge_range(0, 0, 0, last_col, title, formats["title"])
+        if n_sheets > 1:
+            page_note = f" (Sayfa {sheet_no + 1}/{n_sheets}: {lo + 1:,} - {hi:,}. satırlar)"
+        else:
+            page_note = ""
+        ws.merge_range(1, 0, 1, last_col, subtitle + page_note, formats["subtitle"])
+
+        for col_idx, col_name in enumerate(columns):
+            ws.write(start_row, col_idx, col_name, formats["header"])
+
+        excel_row = start_row + 1
+        for i in range(lo, hi):
+            ws.write_string(excel_row, 0, text_values[i], formats["text"])
+            for col_idx, (values, fmt) in enumerate(zip(number_values, number_formats), start=1):
+                value = values[i]
+                if fmt is None:
+                    ws.write_string(excel_row, col_idx, str(value), formats["text"])
+                elif value == value:   # NaN hücreler boş bırakılır
+                    ws.write_number(excel_row, col_idx, value, fmt)
+            excel_row += 1
+
+        ws.set_column(0, 0, first_col_width)
+        ws.set_column(1, last_col, 18)
+        ws.freeze_panes(start_row + 1, 1)
+
+
+def write_trend_sheet(workbook, writer, daily_channel_df: pd.DataFrame,
+                      daily_category_df: pd.DataFrame, formats: dict):
+    """
+    GunlukTrend sayfasını yazar: üstte gün x kanal tablosu ve günlük ciro
+    çizgi grafiği, altında gün x kategori tablosu. Satırlar sırayla yazılır
+    (constant_memory modu ile uyumlu).
+    """
+    ws = workbook.add_worksheet(TREND_SHEET_NAME)
+    writer.sheets[TREND_SHEET_NAME] = ws
+    date_format = workbook.add_format({"border": 1, "align": "left", "num_format": "dd.mm.yyyy"})
+    block_format = workbook.add_format({"bold": True, "font_size": 11})
+
+    last_col = max(len(daily_channel_df.columns) - 1, 3)
+    ws.merge_range(0, 0, 0, last_col, "Günlük Satış Trendi", formats["title"])
+    if daily_channel_df.empty:
+        subtitle = "Bu dönemde datada okunabilir tarih bilgisi bulunamadı."
+    else:
+        first, last = daily_channel_df["Gun"].iloc[0], daily_channel_df["Gun"].iloc[-1]
+        subtitle = (f"{first:%d.%m.%Y} - {last:%d.%m.%Y} arası günlük kırılım. "
+                    f"Satış olmayan günler 0 olarak gösterilmiştir.")
+    ws.merge_range(1, 0, 1, last_col, subtitle, formats["subtitle"])
+
+    def write_block(row: int, title: str, table: pd.DataFrame) -> int:
+        ws.write(row, 0, title, block_format)
+        row += 1
+        for col_idx, col_name in enumerate(table.columns):
+            ws.write(row, col_idx, col_name, formats["header"])
+        header_row = row
+        columns = [table[c].tolist() for c in table.columns]
+        for i in range(len(table)):
+            row += 1
+            ws.write_datetime(row, 0, columns[0][i].to_pydatetime(), date_format)
+            for col_idx in range(1, len(columns)):
+                value = columns[col_idx][i]
+                if isinstance(value, str):
+                    ws.write_string(row, col_idx, value, formats["text"])
+                else:
+                    fmt = formats["int"] if "Adet" in table.columns[col_idx] else formats["dec"]
+                    ws.write_number(row, col_idx, value, fmt)
+        return header_row
+
+    header_row = write_block(3, "Gün x Kanal", daily_channel_df)
+    n_days = len(daily_channel_df)
+
+    if n_days:
+        chart = workbook.add_chart({"type": "line"})
+        for col_name in ("Online_Ciro", "Fiziksel_Ciro", "Toplam_Ciro"):
+            col_idx = daily_channel_df.columns.get_loc(col_name)
+            chart.add_series({
+                "name": col_name.replace("_", " "),
+                "categories": [TREND_SHEET_NAME, header_row + 1, 0, header_row + n_days, 0],
+                "values": [TREND_SHEET_NAME, header_row + 1, col_idx, header_row + n_days, col_idx],
+            })
+        chart.set_title({"name": "Günlük Ciro"})
+        chart.set_x_axis({"date_axis": True, "num_format": "dd.mm"})
+        chart.set_legend({"position": "bottom"})
+        ws.insert_chart(header_row, len(daily_channel_df.columns) + 1, chart)
+
+    write_block(header_row + n_days + 3, "Gün x Kategori", daily_category_df)
+
+    ws.set_column(0, 0, 14)
+    ws.set_column(1, last_col, 18)
+    ws.freeze_panes(header_row + 1, 1)
+
+
+def write_catalogue_sheets(workbook, writer, products_df: pd.DataFrame, formats: dict):
+    """
+    Tüm ürün kataloğunu (Uzun Tanım, Toplam_Adet, Toplam_Ciro) UrunKatalog
+    sayfa(lar)ına yazar.
+    """
+    if products_df.empty:
+        products_df = pd.DataFrame(columns=[PRODUCT_COL, "Toplam_Adet", "Toplam_Ciro"])
+        subtitle = "Bu dönemde ürün satış verisi bulunamadı."
+    else:
+        subtitle = f"Bu sayfada adet bazında sıralı {len(products_df):,} ürünün tamamı listelenmiştir."
+
+    write_table_sheets(workbook, writer, products_df, CATALOGUE_SHEET_NAME,
+                       "Tüm Ürünler - Adet ve Ciro", subtitle, formats)
+
 
+def export_product_catalogue(df: pd.DataFrame, output_file: str) -> str:
+    """
+    Tüm ürün kataloğunu uzantıya göre Parquet (.parquet) veya CSV olarak
+    yazar. Parquet için 'pyarrow' paketi gerekir.
+    """
+    products_df = get_product_totals_df(df)
+
+    if output_file.lower().endswith(".parquet"):
+        products_df.to_parquet(output_file, index=False)
+    else:
+        products_df.to_csv(output_file, sep=";", index=False, encoding="utf-8-sig")
+
+    print(f"\n📦 Ürün kataloğu yazıldı ({len(products_df):,} ürün): {output_file}")
+    print("-" * 60)
+    return output_file
+
+
+def build_summary_df(total_df: pd.DataFrame, channels_df: pd.DataFrame,
+                     renewed_summary_df: pd.DataFrame, bad_sales: int | None, bad_gift: int | None,
+                     quality_df: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Summary sayfasındaki Metrix / Deger tablosunu üretir.
+    Bozuk satır sayısı bilinmiyorsa (None) o satır yazılmaz.
+    """
     # Summary sheet için küçük bir özet tablo
     summary_rows = []
 
@@ -644,18 +2418,132 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
             "Deger": r["Toplam_Ciro"]
         })
 
-    summary_rows.append({
-        "Metrix": "Satış datası bozuk satır sayısı",
-        "Deger": bad_sales
-    })
-    summary_rows.append({
-        "Metrix": "Gift card datası bozuk satır sayısı",
-        "Deger": bad_gift
-    })
+    if bad_sales is not None:
+        summary_rows.append({
+            "Metrix": "Satış datası bozuk satır sayısı",
+            "Deger": bad_sales
+        })
+    if bad_gift is not None:
+        summary_rows.append({
+            "Metrix": "Gift card datası bozuk satır sayısı",
+            "Deger": bad_gift
+        })
+
+    # Veri kalitesi kuralları (kural başına takılan satır sayısı)
+    if quality_df is not None:
+        for _, row in quality_df.iterrows():
+            summary_rows.append({
+                "Metrix": f"{row['Kaynak']} - {row['Kural']}",
+                "Deger": row["Satir_Sayisi"]
+            })
+
+    return pd.DataFrame(summary_rows)
 
-    summary_df = pd.DataFrame(summary_rows)
 
-    with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
+def build_report_frames(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_gift: int,
+                        quality_df: pd.DataFrame | None = None,
+                        price_stats: tuple | None = None,
+                        workers: int = REPORT_WORKERS,
+                        cache: ResultCache | None = None,
+                        process_workers: int = PROCESS_WORKERS) -> dict:
+    """
+    Excel raporundaki her sayfanın arkasındaki DataFrame'leri sayfa adıyla döner.
+    'RefurbishedOzet' ayrı bir sayfa değildir, RefurbishedTotal açıklamasında
+    ve Summary'de kullanılır; 'GunlukKanal' ve 'GunlukKategori' birlikte
+    GunlukTrend sayfasına yazılır. UrunKatalog sadece CATALOGUE_IN_EXCEL açıksa üretilir.
+    get_* fonksiyonları datayı sadece okuduğu için aynı anda iş parçacıklarında
+    çalıştırılır; Summary diğer tablolar bitince bunlardan kurulur.
+    cache verilirse her get_* çıktısı ResultCache üzerinden okunur / saklanır.
+    process_workers > 0 ise bölümler paylaşılan Arrow frame üzerinden süreç
+    işçilerinde hesaplanır (run_sections_in_processes).
+    """
+    tasks = {
+        "Toplam": (get_total_df, df),
+        "Kanal": (get_channels_df, df),                  # sheet yok ama Summary için kullanıyoruz
+        "RefurbishedOzet": (get_renewed_summary_df, df),
+        "Kategori": (get_category_df, df),
+        "MarkaTotal": (get_brand_all_df, df),
+        "MagazaTotal": (get_store_online_offline_all_df, df),
+        "RefurbishedTotal": (get_renewed_by_category_df, df),
+        "ProductTotal": (get_top_products_top50_df, df),
+        "GiftCardTotal": (get_giftcard_products_df, df_gc),
+        RECON_SHEET_NAME: (get_giftcard_reconciliation_df, df, df_gc),
+        "GunlukKanal": (get_daily_channel_df, df),
+        "GunlukKategori": (get_daily_category_df, df),
+    }
+    if CATALOGUE_IN_EXCEL:
+        tasks[CATALOGUE_SHEET_NAME] = (get_product_totals_df, df)
+    if price_stats is None:
+        tasks["BirimFiyatMarka"] = (get_unit_price_stats_df, df, BRAND_COL)
+        tasks["BirimFiyatUrun"] = (get_unit_price_stats_df, df, PRODUCT_COL)
+
+    if process_workers > 0:
+        results = run_sections_in_processes(tasks, process_workers, cache)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            if cache is None:
+                futures = {name: pool.submit(fn, *args) for name, (fn, *args) in tasks.items()}
+            else:
+                futures = {name: pool.submit(cache.call, fn, *args, label=name)
+                           for name, (fn, *args) in tasks.items()}
+            results = {name: future.result() for name, future in futures.items()}
+
+    if price_stats is not None:
+        # Parça parça (out-of-core) çalışmada satır bazlı data yok, diskten hesaplanmış hali gelir
+        results["BirimFiyatMarka"], results["BirimFiyatUrun"] = price_stats
+    store_online_all_df, store_offline_all_df = results["MagazaTotal"]
+
+    frames = {
+        "Summary": build_summary_df(results["Toplam"], results["Kanal"], results["RefurbishedOzet"],
+                                    bad_sales, bad_gift, quality_df),
+        "Kategori": results["Kategori"],
+        "MarkaTotal": results["MarkaTotal"],
+        "MagazaOnlineTotal": store_online_all_df,
+        "MagazaFizikselTotal": store_offline_all_df,
+        "RefurbishedOzet": results["RefurbishedOzet"],
+        "RefurbishedTotal": results["RefurbishedTotal"],
+        "ProductTotal": results["ProductTotal"],
+        "GiftCardTotal": results["GiftCardTotal"],
+        RECON_SHEET_NAME: results[RECON_SHEET_NAME],
+        "GunlukKanal": results["GunlukKanal"],
+        "GunlukKategori": results["GunlukKategori"],
+    }
+    if CATALOGUE_IN_EXCEL:
+        frames[CATALOGUE_SHEET_NAME] = results[CATALOGUE_SHEET_NAME]
+    frames["BirimFiyatMarka"] = results["BirimFiyatMarka"]
+    frames["BirimFiyatUrun"] = results["BirimFiyatUrun"]
+    return frames
+
+
+def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_gift: int,
+                    output_file: str | None = None, quality_df: pd.DataFrame | None = None,
+                    price_stats: tuple | None = None, frames: dict | None = None):
+    if output_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = f"statvision_report_{timestamp}.xlsx"
+
+    if frames is None:
+        frames = build_report_frames(df, df_gc, bad_sales, bad_gift,
+                                     quality_df=quality_df, price_stats=price_stats)
+    summary_df = frames["Summary"]
+    category_df = frames["Kategori"]
+    brand_all_df = frames["MarkaTotal"]
+    store_online_all_df = frames["MagazaOnlineTotal"]
+    store_offline_all_df = frames["MagazaFizikselTotal"]
+    renewed_summary_df = frames["RefurbishedOzet"]
+    renewed_by_cat_df = frames["RefurbishedTotal"]
+    top_products50_df = frames["ProductTotal"]
+    giftcard_df = frames["GiftCardTotal"]
+    product_all_df = frames.get(CATALOGUE_SHEET_NAME)
+    price_brand_df = frames["BirimFiyatMarka"]
+    price_product_df = frames["BirimFiyatUrun"]
+    recon_df = frames[RECON_SHEET_NAME]
+    daily_channel_df = frames["GunlukKanal"]
+    daily_category_df = frames["GunlukKategori"]
+
+    # constant_memory: satırlar yazıldıkça diske aktarılır (tüm sayfalarda satırlar sırayla yazılmalı)
+    with pd.ExcelWriter(output_file, engine="xlsxwriter",
+                        engine_kwargs={"options": {"constant_memory": True}}) as writer:
         workbook = writer.book
 
         # ==== ORTAK FORMATLAR ====
@@ -724,7 +2612,7 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
             else:
                 summary_ws.write(excel_row, 1, row["Deger"], number_format_int)
 
-        summary_ws.set_column("A:A", 32)
+        summary_ws.set_column("A:A", 48)
         summary_ws.set_column("B:B", 18)
         summary_ws.freeze_panes(start_row + 1, 0)
 
@@ -746,8 +2634,8 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
         for col_idx, col_name in enumerate(category_df.columns):
             category_ws.write(start_row_cat, col_idx, col_name, header_format)
 
-        for i, row in category_df.iterrows():
-            excel_row = start_row_cat + 1 + i
+        for row_idx, (_, row) in enumerate(category_df.iterrows()):
+            excel_row = start_row_cat + 1 + row_idx
             category_ws.write(excel_row, 0, row[category_df.columns[0]], metric_text_format)
             if "Toplam_Adet" in category_df.columns:
                 category_ws.write(excel_row, 1, row["Toplam_Adet"], number_format_int)
@@ -782,8 +2670,8 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
         for col_idx, col_name in enumerate(brand_all_df.columns):
             brand_ws.write(start_row_brand, col_idx, col_name, header_format)
 
-        for i, row in brand_all_df.iterrows():
-            excel_row = start_row_brand + 1 + i
+        for row_idx, (_, row) in enumerate(brand_all_df.iterrows()):
+            excel_row = start_row_brand + 1 + row_idx
             brand_ws.write(excel_row, 0, row[brand_all_df.columns[0]], metric_text_format)
             if "Toplam_Adet" in brand_all_df.columns:
                 brand_ws.write(excel_row, 1, row["Toplam_Adet"], number_format_int)
@@ -817,8 +2705,8 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
         for col_idx, col_name in enumerate(store_online_all_df.columns):
             online_ws.write(start_row_online, col_idx, col_name, header_format)
 
-        for i, row in store_online_all_df.iterrows():
-            excel_row = start_row_online + 1 + i
+        for row_idx, (_, row) in enumerate(store_online_all_df.iterrows()):
+            excel_row = start_row_online + 1 + row_idx
             online_ws.write(excel_row, 0, row[store_online_all_df.columns[0]], metric_text_format)
             if "Toplam_Adet" in store_online_all_df.columns:
                 online_ws.write(excel_row, 1, row["Toplam_Adet"], number_format_int)
@@ -852,8 +2740,8 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
         for col_idx, col_name in enumerate(store_offline_all_df.columns):
             offline_ws.write(start_row_offline, col_idx, col_name, header_format)
 
-        for i, row in store_offline_all_df.iterrows():
-            excel_row = start_row_offline + 1 + i
+        for row_idx, (_, row) in enumerate(store_offline_all_df.iterrows()):
+            excel_row = start_row_offline + 1 + row_idx
             offline_ws.write(excel_row, 0, row[store_offline_all_df.columns[0]], metric_text_format)
             if "Toplam_Adet" in store_offline_all_df.columns:
                 offline_ws.write(excel_row, 1, row["Toplam_Adet"], number_format_int)
@@ -898,8 +2786,8 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
                 for col_idx, col_name in enumerate(renewed_by_cat_df.columns):
                     ref_ws.write(start_row_ref, col_idx, col_name, header_format)
 
-                for i, row in renewed_by_cat_df.iterrows():
-                    excel_row = start_row_ref + 1 + i
+                for row_idx, (_, row) in enumerate(renewed_by_cat_df.iterrows()):
+                    excel_row = start_row_ref + 1 + row_idx
                     ref_ws.write(excel_row, 0, row[renewed_by_cat_df.columns[0]], metric_text_format)
                     if "Toplam_Adet" in renewed_by_cat_df.columns:
                         ref_ws.write(excel_row, 1, row["Toplam_Adet"], number_format_int)
@@ -1024,23 +2912,1534 @@ def export_to_excel(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_g
         gift_ws.set_column("C:D", 22)  # tutarlar
         gift_ws.freeze_panes(start_row_gc + 1, 1)
 
+        table_formats = {
+            "title": title_format,
+            "subtitle": subtitle_format,
+            "header": header_format,
+            "text": metric_text_format,
+            "int": number_format_int,
+            "dec": number_format_dec,
+        }
+
+        # ================== GIFT CARD MUTABAKAT SHEET (GiftCardMutabakat) ==================
+        if recon_df.empty:
+            recon_note = "Bu dönemde gift card datası bulunmamaktadır."
+        else:
+            n_diff = int((recon_df["Durum"] != "Uyumlu").sum())
+            recon_note = (f"Gift card datasındaki {len(recon_df):,} ürünün {n_diff:,} tanesi satış datasıyla "
+                          f"uyuşmuyor. Net tutar = fatura - indirim, satış tarafı KDV dahil cirodur.")
+        write_table_sheets(workbook, writer, recon_df, RECON_SHEET_NAME,
+                           "Gift Card - Satış Mutabakatı", recon_note, table_formats, first_col_width=40)
+
+        # ================== GÜNLÜK TREND SHEET (GunlukTrend) ==================
+        write_trend_sheet(workbook, writer, daily_channel_df, daily_category_df, table_formats)
+
+        # ================== ÜRÜN KATALOĞU SHEET (UrunKatalog, tüm ürünler) ==================
+        if product_all_df is not None:
+            write_catalogue_sheets(workbook, writer, product_all_df, table_formats)
+
+        # ================== BİRİM FİYAT SHEETLERİ (BirimFiyatMarka / BirimFiyatUrun) ==================
+        price_note = "Birim fiyat = KDV dahil ciro / adet. Adedi 0 veya negatif olan satırlar hariçtir."
+        write_table_sheets(workbook, writer, price_brand_df, "BirimFiyatMarka",
+                           "Marka Bazlı Birim Fiyat Dağılımı", price_note, table_formats,
+                           first_col_width=28)
+        write_table_sheets(workbook, writer, price_product_df, "BirimFiyatUrun",
+                           "Ürün Bazlı Birim Fiyat Dağılımı", price_note, table_formats)
 
     print(f"\n📊 Excel raporu oluşturuldu: {output_file}")
     print("-" * 60)
+    return output_file
+
+
+# === ÇOKLU FORMAT ÇIKTI (CSV / PARQUET / HTML) ===
+
+def export_csv_bundle(frames: dict, output_dir: str) -> str:
+    """
+    Her sayfa tablosunu output_dir/<sayfa>.csv olarak (';' ayraçlı, Excel'in
+    Türkçe karakterleri doğru açması için BOM'lu UTF-8) yazar.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for sheet, frame in frames.items():
+        frame.to_csv(os.path.join(output_dir, f"{sheet}.csv"), sep=";", index=False,
+                     encoding="utf-8-sig")
+    return output_dir
+
+
+def export_parquet_bundle(frames: dict, output_dir: str) -> str:
+    """
+    Her sayfa tablosunu output_dir/<sayfa>.parquet olarak yazar. 'pyarrow' paketi gerekir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for sheet, frame in frames.items():
+        frame.to_parquet(os.path.join(output_dir, f"{sheet}.parquet"), index=False)
+    return output_dir
+
+
+def export_html_dashboard(frames: dict, output_file: str, max_rows: int = HTML_MAX_ROWS) -> str:
+    """
+    Tek dosyalık, dış bağımlılığı olmayan HTML pano yazar: üstte Summary
+    metrikleri, altında her sayfa tablosunun ilk max_rows satırı.
+    """
+    css = (
+        "body{font-family:Arial,sans-serif;margin:24px;color:#222}"
+        "h1{font-size:20px}h2{font-size:16px;margin-top:28px}"
+        "table{border-collapse:collapse;font-size:12px}"
+        "th{background:#D9E1F2;border:1px solid #999;padding:4px 8px}"
+        "td{border:1px solid #ccc;padding:3px 8px;text-align:right}"
+        "td:first-child{text-align:left}.note{color:#666;font-style:italic;font-size:11px}"
+    )
+    parts = [
+        "<!DOCTYPE html><html lang='tr'><head><meta charset='utf-8'>",
+        f"<title>STATVISION - Satış Özeti</title><style>{css}</style></head><body>",
+        "<h1>STATVISION - Satış Özeti</h1>",
+        f"<p class='note'>Rapor Tarihi: {datetime.now().strftime('%d.%m.%Y %H:%M')}</p>",
+    ]
+    for sheet, frame in frames.items():
+        parts.append(f"<h2>{sheet}</h2>")
+        if frame.empty:
+            parts.append("<p class='note'>Bu dönemde veri bulunamadı.</p>")
+            continue
+        if len(frame) > max_rows:
+            parts.append(f"<p class='note'>{len(frame):,} satırın ilk {max_rows} satırı gösteriliyor.</p>")
+        parts.append(frame.head(max_rows).to_html(index=False, border=0, na_rep="",
+                                                  float_format=lambda v: f"{v:,.2f}"))
+    parts.append("</body></html>")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return output_file
+
+
+def export_report(df: pd.DataFrame, df_gc: pd.DataFrame, bad_sales: int, bad_gift: int,
+                  formats=REPORT_FORMATS, output_base: str | None = None,
+                  quality_df: pd.DataFrame | None = None, price_stats: tuple | None = None,
+                  workers: int = REPORT_WORKERS, cache: ResultCache | None = None,
+                  process_workers: int = PROCESS_WORKERS) -> dict:
+    """
+    Sayfa tablolarını bir kez (paralel) hazırlar ve istenen her formata
+    aynı anda yazar:
+      xlsx    -> <output_base>.xlsx (export_to_excel)
+      csv     -> <output_base>_csv/<sayfa>.csv
+      parquet -> <output_base>_parquet/<sayfa>.parquet
+      html    -> <output_base>.html
+    Dönüş: {format: yazılan yol}
+    """
+    if output_base is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_base = f"statvision_report_{timestamp}"
+
+    unknown = [f for f in formats if f not in REPORT_FORMAT_CHOICES]
+    if unknown:
+        raise ValueError(f"Bilinmeyen çıktı formatı: {unknown}")
+
+    frames = build_report_frames(df, df_gc, bad_sales, bad_gift, quality_df=quality_df,
+                                 price_stats=price_stats, workers=workers, cache=cache,
+                                 process_workers=process_workers)
+    if cache is not None:
+        cache.print_stats()
+        cache.prune()
+
+    writers = {
+        "xlsx": lambda: export_to_excel(df, df_gc, bad_sales, bad_gift,
+                                        output_file=f"{output_base}.xlsx", frames=frames),
+        "csv": lambda: export_csv_bundle(frames, f"{output_base}_csv"),
+        "parquet": lambda: export_parquet_bundle(frames, f"{output_base}_parquet"),
+        "html": lambda: export_html_dashboard(frames, f"{output_base}.html"),
+    }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(formats)))) as pool:
+        futures = {fmt: pool.submit(writers[fmt]) for fmt in dict.fromkeys(formats)}
+        outputs = {fmt: future.result() for fmt, future in futures.items()}
+
+    for fmt, path in outputs.items():
+        if fmt != "xlsx":
+            print(f"📁 {fmt.upper()} çıktısı: {path}")
+    if len(outputs) > 1 or "xlsx" not in outputs:
+        print("-" * 60)
+    return outputs
+
+
+# === HIZLI ÖNİZLEME (STRATIFIED BYTE-RANGE ÖRNEKLEME) ===
+
+def sample_byte_ranges(path: str, n_blocks: int = PREVIEW_BLOCKS,
+                       block_bytes: int = PREVIEW_BLOCK_BYTES,
+                       seed: int | None = None) -> tuple[pd.DataFrame, float, int]:
+    """
+    Dosyayı n_blocks eşit byte dilimine böler ve her dilimin içinden rastgele
+    bir konumda block_bytes'lık bir pencere okur (dosyanın tamamı okunmaz).
+    Pencereye başlangıcı düşen satırlar parse edilir; pencereden önce başlayan
+    yarım satır atlanır (tam pencere başında başlayan satır atlanmaz),
+    son satır tamamlanır. Dosya örneklemden küçükse bloklar dosyayı
+    boşluksuz kaplar ve her satır tam bir kez okunur (tam sayım).
+
+    Not: Katmanlar Magaza / Kategori2 değil, dosyadaki byte konumlarıdır;
+    bu kolonların kitle payları dosyanın tamamı okunmadan bilinmediği için
+    sonradan katmanlama (post-stratification) yapılmaz. GfK dosyaları mağaza /
+    kategori sırasıyla geldiğinde byte dilimleri bu katmanları yaklaşık
+    orantılı temsil eder; sırasız dosyada örneklem basit rastgele blok
+    örneklemesine denk olur.
+
+    Dönüş: (örneklem DataFrame'i, '_blok' kolonu ile; örneklem oranı = okunan byte / toplam byte;
+            gerçekte kullanılan blok boyutu - tam sayımda istenenden küçük olabilir)
+    """
+    rng = np.random.default_rng(seed)
+    size = os.path.getsize(path)
+    frames = []
+    dialect = sniff_dialect(path)
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        span = size - data_start
+
+        if span <= n_blocks * block_bytes:
+            # Dosya örneklemden küçükse hepsini ardışık bloklar halinde oku (tam sayım)
+            block_bytes = max(1, -(-span // n_blocks))
+            starts = [data_start + k * block_bytes for k in range(n_blocks)]
+        else:
+            stratum = span / n_blocks
+            starts = [
+                data_start + int(k * stratum + rng.random() * (stratum - block_bytes))
+                for k in range(n_blocks)
+            ]
+
+        for block_id, start in enumerate(starts):
+            if start >= size:
+                continue
+            if start > data_start:
+                # Pencereden önce başlayan yarım satır önceki pencereye aittir.
+                # Bir byte geriden okunur: start'tan hemen önce satır sonu varsa
+                # sadece o '\n' atlanır, start'ta başlayan satır pencerede kalır.
+                f.seek(start - 1)
+                f.readline()
+                if f.tell() > start + block_bytes:
+                    continue
+                window = f.read(start + block_bytes - f.tell())
+            else:
+                f.seek(start)
+                window = f.read(block_bytes)
+            if not window:
+                continue
+            if not window.endswith(b"\n"):
+                window += f.readline()
+
+            block = pd.read_csv(
+                io.BytesIO(header + window),
+                **get_read_csv_kwargs(dialect),
+                encoding=dialect["encoding"],
+                encoding_errors="replace",
+                on_bad_lines="skip",
+                dtype=str,
+            )
+            block["_blok"] = block_id
+            frames.append(block)
+
+    sample = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    sampling_fraction = min(1.0, (len(starts) * block_bytes) / span) if span else 1.0
+    return sample, sampling_fraction, block_bytes
+
+
+def estimate_totals(sample: pd.DataFrame, n_blocks: int, sampling_fraction: float,
+                    group_col: str | None = None) -> pd.DataFrame:
+    """
+    Örneklemden adet ve ciro toplamlarını tüm dosyaya ölçekler.
+    Bloklar örnekleme birimidir: her blok (dilim) toplamı y_b ile
+    T = sum(y_b) / f  (f = örneklem oranı) tahmin edilir,
+    varyans bloklar arası dağılımdan (sonlu kitle düzeltmesi ile) hesaplanır.
+    *_GA kolonları %95 güven aralığının yarı genişliğidir (± değer).
+    """
+    keys = ["_blok"] + ([group_col] if group_col else [])
+    agg = sample.groupby(keys, dropna=True)[[QTY_COL, REVENUE_COL]].sum()
+
+    result = None
+    for value, label in ((QTY_COL, "Adet"), (REVENUE_COL, "Ciro")):
+        if group_col:
+            y = agg[value].unstack(fill_value=0).reindex(range(n_blocks), fill_value=0)
+        else:
+            y = agg[value].reindex(range(n_blocks), fill_value=0).to_frame("Toplam")
+
+        block_totals = y.to_numpy(dtype="float64")
+        scale = 1.0 / sampling_fraction
+        estimate = block_totals.sum(axis=0) * scale
+        # n pencere, M = n / f pencerelik kitleden seçilmiş gibi: Var(T) = M^2 (1 - f) s^2 / n
+        if sampling_fraction >= 1:
+            variance = np.zeros(block_totals.shape[1])   # Tam sayım: belirsizlik yok (tek blokta da)
+        else:
+            variance = n_blocks * (1 - sampling_fraction) * block_totals.var(axis=0, ddof=1) * scale ** 2
+
+        part = pd.DataFrame({
+            f"Tahmini_{label}": estimate,
+            f"{label}_GA": PREVIEW_Z * np.sqrt(np.maximum(variance, 0)),
+        }, index=y.columns)
+        result = part if result is None else result.join(part)
+
+    counts = sample.groupby(group_col).size() if group_col else pd.Series({"Toplam": len(sample)})
+    result["Orneklem_Satir"] = counts.reindex(result.index).fillna(0).astype("int64")
+
+    result = result.sort_values("Tahmini_Ciro", ascending=False)
+    if group_col:
+        return result.rename_axis(group_col).reset_index()
+    return result.reset_index(drop=True)
+
+
+def preview_report(path: str, n_blocks: int = PREVIEW_BLOCKS,
+                   block_bytes: int = PREVIEW_BLOCK_BYTES, seed: int | None = None):
+    """
+    Büyük bir teslimatın tamamını okumadan, byte dilimlerinden alınan örneklemle
+    genel toplam, kategori, marka, mağaza ve kanal tablolarının tahminlerini
+    güven aralıklarıyla birlikte ekrana basar.
+    """
+    print("\n⚡ HIZLI ÖNİZLEME (örneklem tahmini)")
+
+    if path.lower().endswith((".gz", ".zst", ".zstd")):
+        print("Önizleme modu byte aralıklarına atladığı için sadece sıkıştırılmamış CSV'lerde çalışır.")
+        print("-" * 60)
+        return
+
+    started = time.perf_counter()
+    sample, fraction, block_bytes = sample_byte_ranges(path, n_blocks, block_bytes, seed)
+    if sample.empty:
+        print("Örneklem alınamadı (dosya boş olabilir).")
+        print("-" * 60)
+        return
+
+    clean_sales_df(sample, decimal=sniff_dialect(path)["decimal"])
+    sample["Kanal"] = np.where(sample[ORG_COL] > 5000, "Online",
+                               np.where(sample[ORG_COL] <= 5000, "Fiziksel", None))
+
+    print(f"Örneklem: {len(sample):,} satır, dosyanın ~%{fraction * 100:.2f}'i "
+          f"({n_blocks} dilim x {block_bytes / 1024:,.1f} KB"
+          + (", tam sayım)" if fraction >= 1 else ")"))
+    print("Tahmin ± değerleri %95 güven aralığının yarı genişliğidir.")
+    print("-" * 60)
+
+    with pd.option_context("display.float_format", "{:,.0f}".format):
+        total = estimate_totals(sample, n_blocks, fraction).iloc[0]
+        print("\n1) GENEL TOPLAM (TAHMİN)")
+        print(f"Toplam Adet : {total['Tahmini_Adet']:,.0f} ± {total['Adet_GA']:,.0f}")
+        print(f"Toplam Ciro : {total['Tahmini_Ciro']:,.2f} ± {total['Ciro_GA']:,.2f} TL")
+        print("-" * 60)
+
+        if CATEGORY_COL in sample.columns:
+            print("\n2) KATEGORİ BAZLI TOPLAM (Kategori2, TAHMİN)")
+            print(estimate_totals(sample, n_blocks, fraction, CATEGORY_COL).to_string(index=False))
+            print("-" * 60)
+
+        if BRAND_COL in sample.columns:
+            print("\n3) MARKA BAZLI TOP 10 (TAHMİN)")
+            print(estimate_totals(sample, n_blocks, fraction, BRAND_COL).head(10).to_string(index=False))
+            print("-" * 60)
+
+        if STORE_COL in sample.columns:
+            stores = estimate_totals(sample, n_blocks, fraction, STORE_COL)
+            mask_online = stores[STORE_COL].isin(ONLINE_STORES)
+            print("\n4) MAĞAZA BAZLI TOP 10 - ONLINE (TAHMİN)")
+            print(stores[mask_online].head(10).to_string(index=False))
+            print("\n4) MAĞAZA BAZLI TOP 10 - FİZİKSEL (TAHMİN)")
+            print(stores[~mask_online].head(10).to_string(index=False))
+            print("-" * 60)
+
+        print("\n5) KANAL BAZLI TOPLAM (TAHMİN)")
+        print(estimate_totals(sample, n_blocks, fraction, "Kanal").to_string(index=False))
+        print("-" * 60)
+
+    print(f"\n⏱️ Önizleme süresi: {time.perf_counter() - started:.1f} sn")
+
+
+# === BELLEK BÜTÇESİ PLANLAYICI ===
+
+def get_rss_mb() -> float | None:
+    """
+    Sürecin o anki bellek kullanımını (RSS, MB) döner.
+    /proc olmayan sistemlerde ölçüm yapılamaz, None döner.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def estimate_uncompressed_size(path: str) -> int:
+    """
+    Girdi dosyasının açılmış (CSV) boyutunu byte olarak tahmin eder.
+    Seekable .zst için seek table'daki gerçek boyut, diğer sıkıştırılmış
+    dosyalar için PLANNER_COMPRESSION_RATIO kullanılır.
+    """
+    size = os.path.getsize(path)
+    lower = path.lower()
+
+    if lower.endswith((".zst", ".zstd")):
+        frames = read_zstd_seek_table(path)
+        if frames:
+            return sum(d_size for _, _, d_size in frames)
+        return int(size * PLANNER_COMPRESSION_RATIO)
+
+    if lower.endswith(".gz"):
+        return int(size * PLANNER_COMPRESSION_RATIO)
+
+    return size
+
+
+def get_aggregation_keys(columns) -> list[str]:
+    """
+    Rapor fonksiyonlarının (get_*_df) gruplama yaptığı tüm kolonlar.
+    Satırlar bu kolonlara göre toplanırsa adet / ciro toplamları değişmez,
+    bu yüzden parça modunda data bu anahtarlara sıkıştırılarak tutulur.
+    """
+    columns = list(columns)
+    keys = [c for c in (CATEGORY_COL, CATEGORY3_COL, ORG_COL, BRAND_COL, STORE_COL, PRODUCT_COL) if c in columns]
+    empty = pd.DataFrame(columns=columns)
+    renewed_col = find_renewed_column(empty)
+    if renewed_col is not None:
+        keys.append(renewed_col)
+    date_col = find_date_column(empty)
+    if date_col is not None:
+        keys.append(date_col)   # Günlük trend tabloları için
+    return keys
+
+
+def plan_execution(path: str, memory_limit_mb: float) -> dict:
+    """
+    Girdi boyutu, ilk PLANNER_SAMPLE_ROWS satırdaki kolon kardinalitesi ve
+    verilen bellek sınırına göre çalışma planını çıkarır:
+    - dtypes     : farklı değer oranı düşük metin kolonları için 'category'
+    - mode       : 'bellek' (tüm data bellekte) veya 'parca' (out-of-core, parça parça toplama)
+    - chunk_rows : parça modunda bir seferde okunacak satır sayısı
+    - disk_cache : parça modunda satır bazlı fiyat kolonlarının diske (Parquet) yazılıp yazılmayacağı
+    """
+    lines = []
+    dialect = sniff_dialect(path)
+    # Satır boyutu ham byte olarak ölçülür; dosya boyutu da byte olduğu için
+    # kodlama (cp1254 / utf-8) satır sayısı tahminini değiştirmez
+    with open_input_bytes(path) as stream:
+        for _ in range(PLANNER_SAMPLE_ROWS + 1):
+            line = stream.readline()
+            if not line:
+                break
+            lines.append(line)
+
+    sample = pd.read_csv(io.BytesIO(b"".join(lines)), **get_read_csv_kwargs(dialect),
+                         encoding=dialect["encoding"], encoding_errors="replace",
+                         on_bad_lines="skip", dtype=str)
+    n_sample = max(len(sample), 1)
+    sample_bytes = sum(len(line) for line in lines[1:])
+    avg_line_bytes = sample_bytes / max(len(lines) - 1, 1)
+
+    data_bytes = estimate_uncompressed_size(path)
+    est_rows = int(data_bytes / avg_line_bytes) if avg_line_bytes else 0
+
+    numeric_cols = {QTY_COL, REVENUE_COL, ORG_COL}
+    usage = sample.memory_usage(deep=True, index=False)
+    dtypes = {}
+    cardinality = {}
+    bytes_per_row = 0.0
+
+    for col in sample.columns:
+        ratio = sample[col].nunique(dropna=True) / n_sample
+        cardinality[col] = ratio
+        if col in numeric_cols:
+            bytes_per_row += 8
+        elif col != STORE_COL and ratio <= PLANNER_CATEGORY_MAX_RATIO:
+            # Mağaza kolonu temizlikte str'ye çevrildiği için category yapılmaz
+            dtypes[col] = "category"
+            bytes_per_row += 4
+        else:
+            bytes_per_row += usage[col] / n_sample
+
+    est_memory_mb = est_rows * bytes_per_row * PLANNER_OVERHEAD / 1024 ** 2
+    budget_mb = memory_limit_mb - (get_rss_mb() or 0)
+
+    if est_memory_mb <= budget_mb:
+        mode = "bellek"
+        chunk_rows = est_rows
+    else:
+        mode = "parca"
+        # Bütçenin 1/4'ü okunan parçaya, kalanı ara toplamlara ve geçici kopyalara bırakılır
+        chunk_rows = int(max(budget_mb, 0) * 1024 ** 2 / (bytes_per_row * PLANNER_OVERHEAD) / 4)
+        chunk_rows = max(PLANNER_MIN_CHUNK_ROWS, chunk_rows)
+
+    return {
+        "path": path,
+        "memory_limit_mb": memory_limit_mb,
+        "data_mb": data_bytes / 1024 ** 2,
+        "est_rows": est_rows,
+        "bytes_per_row": bytes_per_row,
+        "est_memory_mb": est_memory_mb,
+        "budget_mb": budget_mb,
+        "mode": mode,
+        "chunk_rows": chunk_rows,
+        "dtypes": dtypes,
+        "cardinality": cardinality,
+        "disk_cache": mode == "parca" and importlib.util.find_spec("pyarrow") is not None,
+    }
+
+
+def print_plan(plan: dict):
+    """
+    Planlayıcının kararlarını ekrana yazar.
+    """
+    print("\n🧠 ÇALIŞMA PLANI (bellek bütçesi)")
+    print(f"Girdi dosyası           : {plan['path']} (~{plan['data_mb']:,.0f} MB açık CSV)")
+    print(f"Tahmini satır sayısı    : {plan['est_rows']:,}")
+    print(f"Satır başına bellek     : ~{plan['bytes_per_row']:,.0f} byte")
+    print(f"Tahmini bellek ihtiyacı : ~{plan['est_memory_mb']:,.0f} MB "
+          f"(bütçe {plan['budget_mb']:,.0f} / sınır {plan['memory_limit_mb']:,.0f} MB)")
+
+    if plan["dtypes"]:
+        print(f"category kolonları      : {', '.join(plan['dtypes'])}")
+
+    if plan["mode"] == "bellek":
+        print("Karar                   : Tüm data bellekte işlenecek.")
+    else:
+        print(f"Karar                   : Parça modu (out-of-core), parça başına {plan['chunk_rows']:,} satır.")
+        print("                          Rapor tabloları gruplama anahtarlarına sıkıştırılmış toplamlardan üretilecek.")
+        print("                          Tekrarlanan satır kontrolü parça içinde yapılır.")
+        if plan["disk_cache"]:
+            print("Disk cache              : Birim fiyat kolonları geçici Parquet dosyasına yazılacak.")
+        else:
+            print("Disk cache              : pyarrow yok, birim fiyat dağılımı sayfaları boş kalacak.")
+    print("-" * 60)
+
+
+def enforce_memory_limit(plan: dict, chunk_rows: int) -> int:
+    """
+    RSS bellek sınırının %90'ını geçtiyse önce çöp toplayıp yeniden ölçer;
+    hâlâ sınırdaysa sonraki parçaların boyutunu yarıya indirir, parça boyutu
+    zaten en küçük değerdeyse MemoryError fırlatır. Bellek PLANNER_REGROW_RATIO
+    altına inmişse küçültülmüş parça boyutu plandaki değere kadar iki katına çıkar.
+    Yeni parça boyutunu döner.
+    """
+    rss = get_rss_mb()
+    if rss is None:
+        return chunk_rows
+
+    if rss > plan["memory_limit_mb"] * 0.9:
+        # Serbest bırakılmamış geçici kopyalar yüzünden gereksiz küçültme yapılmasın
+        gc.collect()
+        rss = get_rss_mb() or rss
+
+    if rss <= plan["memory_limit_mb"] * PLANNER_REGROW_RATIO and chunk_rows < plan["chunk_rows"]:
+        new_rows = min(plan["chunk_rows"], chunk_rows * 2)
+        print(f"ℹ️ Bellek {rss:,.0f} MB, yeniden rahat: parça boyutu {chunk_rows:,} → {new_rows:,} satır")
+        return new_rows
+
+    if rss <= plan["memory_limit_mb"] * 0.9:
+        return chunk_rows
+
+    if chunk_rows <= PLANNER_MIN_CHUNK_ROWS:
+        raise MemoryError(
+            f"Bellek sınırı aşıldı: {rss:,.0f} MB > {plan['memory_limit_mb']:,.0f} MB "
+            f"(en küçük parça boyutunda bile)."
+        )
+
+    new_rows = max(PLANNER_MIN_CHUNK_ROWS, chunk_rows // 2)
+    print(f"⚠️ Bellek {rss:,.0f} MB, sınıra yakın: parça boyutu {chunk_rows:,} → {new_rows:,} satır")
+    return new_rows
+
+
+class MemoryBudget:
+    """
+    Watch modunda eşzamanlı işlerin tek bir --memory-limit'i paylaşması için
+    süreç seviyesinde kabul kontrolü. Sınır işler arasında bölünmez: RSS tüm
+    sürecin (diğer işlerin datası dahil) ölçümü olduğu için her iş planını
+    tüm sınıra ve o anki RSS'e göre yapar.
+    - Aynı anda tek iş plan yapıp yükler; böylece her plan, daha önce yüklenmiş
+      işlerin datasını RSS'te görür.
+    - Kalan bütçe en küçük parça boyutu için bile yetmiyorsa iş hata vermek
+      yerine çalışan işlerden biri bitene kadar bekleyip yeniden plan yapar.
+    """
+
+    def __init__(self, limit_mb: float):
+        self.limit_mb = limit_mb
+        self._cond = threading.Condition()
+        self._loading = False
+        self._active = 0
+
+    def load(self, path: str, parse_errors: dict | None = None,
+             quarantine_file: str | None = None) -> tuple[pd.DataFrame, int, dict]:
+        """
+        load_data_planned'ı kabul kontrolüyle çalıştırır. Başarılı dönüşten
+        sonra iş, release() çağrılana kadar bütçeyi kullanan iş sayılır.
+        """
+        with self._cond:
+            while self._loading:
+                self._cond.wait()
+            self._loading = True
+
+        try:
+            while True:
+                plan = plan_execution(path, self.limit_mb)
+                min_chunk_mb = PLANNER_MIN_CHUNK_ROWS * plan["bytes_per_row"] * PLANNER_OVERHEAD * 4 / 1024 ** 2
+                with self._cond:
+                    if self._active == 0 or plan["budget_mb"] >= min_chunk_mb:
+                        break
+                    print(f"⏳ {os.path.basename(path)}: kalan bütçe {plan['budget_mb']:,.0f} MB, "
+                          f"çalışan {self._active} işten biri bitince yeniden planlanacak.")
+                    self._cond.wait()
+
+            print_plan(plan)
+            result = load_data_planned(path, plan, parse_errors, quarantine_file)
+            with self._cond:
+                self._active += 1
+            return result
+        finally:
+            with self._cond:
+                self._loading = False
+                self._cond.notify_all()
+
+    def release(self):
+        """
+        İşin datası bırakıldığında çağrılır; bekleyen işler yeniden plan yapar.
+        """
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+
+def load_data_chunked(path: str, plan: dict, quarantine_file: str | None = None) -> tuple[pd.DataFrame, int, dict]:
+    """
+    Ana satış datasını parça parça okur (out-of-core). Her parça temizlenir,
+    kalite kontrolünden geçirilir ve get_aggregation_keys anahtarlarına göre
+    toplanır. Dönen DataFrame satır yerine bu anahtarların toplamlarını içerir;
+    get_*_df fonksiyonları aynı sonucu verir.
+    Dönüş: (sıkıştırılmış df, bozuk satır sayısı, {"quality_df", "price_stats"})
+    """
+    keys = None
+    partials = []
+    quality = []
+    chunk_rows = plan["chunk_rows"]
+    n_chunks = 0
+
+    spill_path = None
+    spill_writer = None
+    spill_cols = [BRAND_COL, PRODUCT_COL, QTY_COL, REVENUE_COL]
+    if plan["disk_cache"]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        fd, spill_path = tempfile.mkstemp(prefix="statvision_fiyat_", suffix=".parquet")
+        os.close(fd)
+
+    # Parçalar karantina dosyasına eklenerek yazılır; aynı teslimat yeniden
+    # işlendiğinde önceki çalışmanın satırları tekrar etmesin diye dosya baştan açılır
+    if quarantine_file and os.path.exists(quarantine_file):
+        os.remove(quarantine_file)
+
+    try:
+        dialect = sniff_dialect(path)
+        with open_input(path, dialect["encoding"]) as stream:
+            counter = BadLineCountingStream(stream, dialect["sep"], dialect["quoted"])
+            reader = pd.read_csv(counter, **get_read_csv_kwargs(dialect), on_bad_lines="skip",
+                                 dtype=plan["dtypes"], iterator=True)
+            while True:
+                try:
+                    chunk = reader.get_chunk(chunk_rows)
+                except StopIteration:
+                    break
+
+                chunk_errors = {}
+                clean_sales_df(chunk, chunk_errors, dialect["decimal"])
+                quality.append(check_data_quality(
+                    chunk, get_sales_quality_masks(chunk, chunk_errors), "Satış",
+                    chunk_errors, quarantine_file, append=True
+                ))
+
+                if keys is None:
+                    keys = get_aggregation_keys(chunk.columns)
+                partials.append(chunk.groupby(keys, dropna=False, observed=True)[[QTY_COL, REVENUE_COL]].sum())
+
+                if spill_path:
+                    present = [c for c in spill_cols if c in chunk.columns]
+                    table = pa.Table.from_pandas(chunk[present].astype(object), preserve_index=False)
+                    if spill_writer is None:
+                        spill_writer = pq.ParquetWriter(spill_path, table.schema)
+                    spill_writer.write_table(table.cast(spill_writer.schema))
+
+                del chunk
+                n_chunks += 1
+                if n_chunks % PLANNER_COMPACT_EVERY == 0:
+                    partials = [pd.concat(partials).groupby(level=keys, dropna=False).sum()]
+                    gc.collect()
+
+                chunk_rows = enforce_memory_limit(plan, chunk_rows)
+            reader.close()
+        warn_replaced_chars(path, dialect["encoding"], counter.replaced)
+
+        if spill_writer is not None:
+            spill_writer.close()
+
+        if partials:
+            df = pd.concat(partials).groupby(level=keys, dropna=False).sum().reset_index()
+        else:
+            df = pd.DataFrame(columns=[QTY_COL, REVENUE_COL])
+
+        quality_df = (
+            pd.concat(quality).groupby(["Kaynak", "Kural"], sort=False)["Satir_Sayisi"].sum().reset_index()
+            if quality else None
+        )
+
+        # Birim fiyat istatistikleri diskteki Parquet'ten sadece gereken kolonlar okunarak hesaplanır
+        price_stats = []
+        for group_col in (BRAND_COL, PRODUCT_COL):
+            if spill_writer is not None and group_col in spill_writer.schema.names:
+                rows = pd.read_parquet(spill_path, columns=[group_col, QTY_COL, REVENUE_COL])
+                price_stats.append(get_unit_price_stats_df(rows, group_col))
+                del rows
+            else:
+                price_stats.append(get_unit_price_stats_df(pd.DataFrame(), group_col))
+    finally:
+        if spill_path and os.path.exists(spill_path):
+            os.remove(spill_path)
+
+    print(f"📦 Parça modu: {n_chunks} parça okundu, {len(df):,} satırlık toplam tablosuna sıkıştırıldı.")
+    if quarantine_file and os.path.exists(quarantine_file):
+        print(f"⚠️ Kalite kuralına takılan satırlar → {quarantine_file}")
+
+    return df, counter.bad, {"quality_df": quality_df, "price_stats": tuple(price_stats)}
+
+
+def get_chunked_plan(plan: dict, budget_mb: float) -> dict:
+    """
+    'bellek' planını verilen bütçeye göre 'parca' planına çevirir
+    (parça boyutu plan_execution ile aynı kuralla hesaplanır).
+    """
+    chunk_rows = int(max(budget_mb, 0) * 1024 ** 2 / (plan["bytes_per_row"] * PLANNER_OVERHEAD) / 4)
+    return dict(plan, mode="parca", budget_mb=budget_mb,
+                chunk_rows=max(PLANNER_MIN_CHUNK_ROWS, chunk_rows),
+                disk_cache=importlib.util.find_spec("pyarrow") is not None)
+
+
+def load_data_planned(path: str, plan: dict, parse_errors: dict | None = None,
+                      quarantine_file: str | None = None) -> tuple[pd.DataFrame, int, dict]:
+    """
+    Plana göre ana satış datasını yükler.
+    - 'bellek' modunda yüklemeden önce tahmini bellek ihtiyacı güncel bütçeyle
+      (sınır - o anki RSS) karşılaştırılır; sığmıyorsa hiç yüklemeden parça
+      moduna geçilir. Sığıyorsa seçilen dtypes ile normal yükleme yapılır;
+      tahmin tutmayıp yükleme sonrası sınır aşılmışsa data bırakılıp parça
+      moduna geçilir.
+    - 'parca' modunda load_data_chunked kullanılır.
+    Dönüş: (df, bozuk satır sayısı, ek sonuçlar sözlüğü)
+    """
+    if plan["mode"] == "bellek":
+        rss = get_rss_mb()
+        budget_mb = plan["memory_limit_mb"] - (rss or 0)
+        if plan["est_memory_mb"] > budget_mb:
+            print(f"⚠️ Tahmini ihtiyaç ~{plan['est_memory_mb']:,.0f} MB, kalan bütçe "
+                  f"{budget_mb:,.0f} MB: yüklemeden parça moduna geçiliyor.")
+            return load_data_chunked(path, get_chunked_plan(plan, budget_mb), quarantine_file)
+
+        df, bad = load_data_with_bad_lines(path, parse_errors, dtype=plan["dtypes"])
+        rss = get_rss_mb()
+        if rss is None or rss <= plan["memory_limit_mb"]:
+            return df, bad, {}
+
+        print(f"⚠️ Bellek {rss:,.0f} MB ile sınırı aştı, parça moduna geçiliyor.")
+        del df
+        gc.collect()
+        if parse_errors is not None:
+            parse_errors.clear()
+        plan = get_chunked_plan(plan, plan["memory_limit_mb"] - (get_rss_mb() or 0))
+
+    return load_data_chunked(path, plan, quarantine_file)
+
+
+# === PARQUET VERİ SETİ (HAFTA / KANAL BÖLÜMLEME) ===
+
+def get_delivery_week(path: str) -> str:
+    """
+    GfK satış dosya adındaki hafta kodunu (gfk_sales_202546_... -> '202546') döner.
+    Dosya adında yoksa dosyanın değişiklik tarihinin ISO yıl+haftası kullanılır.
+    """
+    match = re.search(r"gfk_sales_(\d{6})", os.path.basename(path))
+    if match:
+        return match.group(1)
+    iso = datetime.fromtimestamp(os.path.getmtime(path)).isocalendar()
+    return f"{iso[0]}{iso[1]:02d}"
+
+
+def get_channel_labels(df: pd.DataFrame) -> pd.Series:
+    """
+    get_channels_df ile aynı kural: OrganizationCode > 5000 Online,
+    <= 5000 Fiziksel, boş / okunamayan kodlar Bilinmeyen.
+    """
+    org = df[ORG_COL]
+    return pd.Series(
+        np.where(org > 5000, "Online", np.where(org <= 5000, "Fiziksel", "Bilinmeyen")),
+        index=df.index,
+    )
+
+
+def convert_to_dataset(path: str, dataset_dir: str, week: str | None = None) -> str:
+    """
+    Ana satış datasını load_data ile temizleyip hafta ve kanala göre
+    Hive tarzı bölümlenmiş Parquet veri setine yazar:
+        dataset_dir/hafta=202546/kanal=Online/<dosya>-0.parquet
+    - Aynı teslimat tekrar dönüştürülürse o haftanın bölümleri yenisiyle değiştirilir.
+    - Satırlar bölüm içinde Magaza / Kategori2'ye göre sıralanır; böylece row group
+      min-max istatistikleri mağaza / kategori filtrelerinde dosya içi atlama sağlar.
+    - Haftalar arası şema uyuşsun diye adet Int64, ciro / OrganizationCode float64,
+      diğerleri string yazılır.
+    - Atlanan bozuk satır sayısı hafta başına DATASET_META_FILE'a kaydedilir
+      (veri seti raporunun Summary sayfası için).
+    'pyarrow' paketi gerekir.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+
+    df, bad = load_data_with_bad_lines(path)
+    week = week or get_delivery_week(path)
+
+    for col in df.columns:
+        if col == QTY_COL:
+            qty = df[col].astype("float64")
+            fractional = qty.notna() & (qty != qty.round())
+            if fractional.any():
+                raise ValueError(f"{QTY_COL} kolonunda {int(fractional.sum()):,} küsuratlı değer var, "
+                                 f"veri setine tam sayı olarak yazılamaz.")
+            df[col] = qty.astype("Int64")
+        elif col in (REVENUE_COL, ORG_COL):
+            df[col] = df[col].astype("float64")
+        elif not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].astype("string")
+
+    df[DATASET_WEEK_COL] = week
+    df[DATASET_CHANNEL_COL] = get_channel_labels(df)
+
+    sort_cols = [c for c in (STORE_COL, CATEGORY_COL) if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind="stable")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pads.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=[DATASET_WEEK_COL, DATASET_CHANNEL_COL],
+        partitioning_flavor="hive",
+        basename_template=f"{get_file_stem(path)}-{{i}}.parquet",
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=DATASET_ROW_GROUP_ROWS,
+        min_rows_per_group=min(DATASET_ROW_GROUP_ROWS, max(len(df), 1)),
+    )
+
+    meta_path = os.path.join(dataset_dir, DATASET_META_FILE)
+    meta = load_ledger(meta_path)
+    meta[week] = {"dosya": os.path.basename(path), "bozuk_satir": bad}
+    save_ledger(meta_path, meta)
+
+    print(f"\n🗂️ Veri seti güncellendi: {dataset_dir} ({DATASET_WEEK_COL}={week}, {len(df):,} satır, "
+          f"{bad:,} bozuk satır atlandı)")
+    print("-" * 60)
+    return dataset_dir
+
+
+def build_dataset_filter(filters: dict):
+    """
+    {kolon: değer veya değer listesi} sözlüğünü pyarrow filtre ifadesine çevirir.
+    Bölüm kolonlarındaki (hafta, kanal) koşullar klasör seviyesinde,
+    diğerleri (Magaza, Kategori2 ...) row group istatistikleriyle uygulanır.
+    """
+    import pyarrow.dataset as pads
+
+    expr = None
+    for col, value in filters.items():
+        if value is None or value == []:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        cond = pads.field(col).isin([str(v) for v in values])
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def load_dataset(dataset_dir: str, filters: dict | None = None,
+                 columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Bölümlenmiş veri setinden sadece filtreye uyan bölümleri / row group'ları
+    ve sadece rapor fonksiyonlarının kullandığı kolonları okur.
+    columns verilmezse: adet, ciro, get_aggregation_keys kolonları ve bölüm kolonları.
+    Dönen DataFrame load_data çıktısı gibi temizlenmiş haldedir.
+    """
+    import pyarrow.dataset as pads
+
+    dataset = pads.dataset(dataset_dir, format="parquet", partitioning="hive")
+    names = dataset.schema.names
+
+    if columns is None:
+        columns = ([QTY_COL, REVENUE_COL] + get_aggregation_keys(names)
+                   + [DATASET_WEEK_COL, DATASET_CHANNEL_COL])
+    columns = [c for c in dict.fromkeys(columns) if c in names]
+
+    table = dataset.to_table(columns=columns, filter=build_dataset_filter(filters or {}))
+    df = table.to_pandas()
+
+    # Bölüm kolonları dictionary olarak gelir; diğer kolonlar gibi düz metne çevrilir
+    for col in (DATASET_WEEK_COL, DATASET_CHANNEL_COL):
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    if QTY_COL in df.columns:
+        df[QTY_COL] = df[QTY_COL].astype("float64")   # Diskte tam sayı; bellekte load_data ile aynı tip
+    parse_date_column(df)   # Tarihi metin olarak yazılmış eski veri setleri için
+    return df
+
+
+def get_dataset_bad_lines(dataset_dir: str, weeks) -> int | None:
+    """
+    Verilen haftaların dönüştürme sırasında atlanan bozuk satır toplamını
+    DATASET_META_FILE'dan okur. Haftalardan birinin kaydı yoksa None döner.
+    """
+    meta = load_ledger(os.path.join(dataset_dir, DATASET_META_FILE))
+    counts = [meta.get(str(week), {}).get("bozuk_satir") for week in weeks]
+    if not counts or any(c is None for c in counts):
+        return None
+    return int(sum(counts))
+
+
+def run_dataset_report(dataset_dir: str, filters: dict):
+    """
+    Veri setinden filtrelenmiş datayı okuyup ekrandaki özet tabloları basar
+    ve Excel raporunu üretir.
+    Bozuk satırlar mağaza / kanal / kategoriye atanamadığı için Summary'deki
+    satış bozuk satır sayısı sadece hafta filtresinde (veya filtresiz) yazılır;
+    veri setinde gift card olmadığı için gift card satırı yazılmaz.
+    """
+    active = {k: v for k, v in filters.items() if v}
+    print(f"\n🗂️ Veri setinden rapor: {dataset_dir}")
+    if active:
+        print("Filtreler: " + ", ".join(f"{k}={v}" for k, v in active.items()))
+
+    started = time.perf_counter()
+    df = load_dataset(dataset_dir, filters)
+    print(f"{len(df):,} satır {time.perf_counter() - started:.2f} sn'de okundu.")
+    print("-" * 60)
+
+    if df.empty:
+        print("Filtreye uyan satır bulunamadı.")
+        print("-" * 60)
+        return
+
+    print_total(df)
+    print_category(df)
+    print_brand(df)
+    print_store(df)
+    print_channels(df)
+    print_renewed(df)
+    print_top_products(df)
+    print_daily_trend(df)
+
+    bad_sales = None
+    if not any(v for k, v in active.items() if k != DATASET_WEEK_COL):
+        bad_sales = get_dataset_bad_lines(dataset_dir, sorted(df[DATASET_WEEK_COL].unique()))
+
+    export_to_excel(df, pd.DataFrame(), bad_sales, None)
+
+
+# === RAPOR ÇALIŞTIRICI ===
+
+def generate_report(sales_path: str, giftcard_path: str | None, output_file: str | None = None,
+                    memory_limit_mb: float | None = None, cache_dir: str | None = None,
+                    memory_budget: MemoryBudget | None = None) -> str:
+    """
+    Tek bir teslimat (satış + opsiyonel gift card dosyası) için
+    bozuk satır sayımı, yükleme ve Excel raporu adımlarını ekrana
+    tablo basmadan çalıştırır. Oluşan rapor dosyasının yolunu döner.
+    memory_limit_mb verilirse yükleme bellek planlayıcısına göre yapılır;
+    memory_budget verilirse (watch modu) yükleme, diğer işlerle paylaşılan
+    süreç bütçesinin kabul kontrolünden geçer ve iş bitince bütçe bırakılır.
+    cache_dir verilirse sayfa tabloları o klasördeki ResultCache üzerinden
+    hesaplanır (aynı teslimat / sadece gift card'ı değişen teslimat yeniden
+    hesaplanmaz). Önbellek nesnesi her teslimat için ayrı açılır; böylece
+    uzun süren watch modunda parmak izi tablosu eski DataFrame'leri tutmaz.
+    """
+    stem = get_file_stem(sales_path)
+    if output_file is None:
+        output_file = f"statvision_report_{stem}.xlsx"
+    out_dir = os.path.dirname(output_file)
+    sales_quarantine = os.path.join(out_dir, f"statvision_karantina_satis_{stem}.csv")
+
+    parse_errors, gc_parse_errors = {}, {}
+    holds_budget = False
+    try:
+        if memory_budget is not None:
+            df, bad_sales, extras = memory_budget.load(sales_path, parse_errors, sales_quarantine)
+            holds_budget = True
+        elif memory_limit_mb:
+            plan = plan_execution(sales_path, memory_limit_mb)
+            print_plan(plan)
+            df, bad_sales, extras = load_data_planned(sales_path, plan, parse_errors, sales_quarantine)
+        else:
+            df, bad_sales = load_data_with_bad_lines(sales_path, parse_errors)
+            extras = {}
+
+        if giftcard_path:
+            df_gc, bad_gift = load_giftcard_data_with_bad_lines(giftcard_path, gc_parse_errors)
+        else:
+            df_gc, bad_gift = pd.DataFrame(), 0
+
+        quality_df = run_data_quality(
+            df, df_gc, parse_errors, gc_parse_errors,
+            sales_quarantine,
+            os.path.join(out_dir, f"statvision_karantina_giftcard_{stem}.csv"),
+            sales_quality=extras.get("quality_df"),
+        )
+
+        cache = ResultCache(cache_dir) if cache_dir else None
+        frames = build_report_frames(df, df_gc, bad_sales, bad_gift, quality_df=quality_df,
+                                     price_stats=extras.get("price_stats"), cache=cache)
+        if cache is not None:
+            cache.print_stats()
+            cache.prune()
+
+        export_to_excel(df, df_gc, bad_sales, bad_gift, output_file=output_file, frames=frames)
+        return output_file
+    finally:
+        if holds_budget:
+            del df
+            gc.collect()
+            memory_budget.release()
+
+
+def run_data_quality(df: pd.DataFrame, df_gc: pd.DataFrame,
+                     parse_errors: dict, gc_parse_errors: dict,
+                     sales_quarantine: str | None, giftcard_quarantine: str | None,
+                     sales_quality: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Satış ve gift card datası için kalite kontrollerini çalıştırır,
+    hatalı satırları karantina dosyalarına yazar ve birleşik kural
+    sayımlarını (Summary sayfası için) döner.
+    sales_quality verilirse (parça modunda okuma sırasında hesaplanmış)
+    satış kontrolleri tekrar çalıştırılmaz.
+    """
+    if sales_quality is not None:
+        results = [sales_quality]
+    else:
+        results = [check_data_quality(df, get_sales_quality_masks(df, parse_errors),
+                                      "Satış", parse_errors, sales_quarantine)]
+    if df_gc is not None and not df_gc.empty:
+        results.append(check_data_quality(df_gc, get_giftcard_quality_masks(df_gc, gc_parse_errors),
+                                          "Gift card", gc_parse_errors, giftcard_quarantine))
+    return pd.concat(results, ignore_index=True)
+
+
+# === REGRESYON TESTİ (GOLDEN ÇIKTI + PERFORMANS BÜTÇESİ) ===
+
+def find_regression_fixtures(fixture_dir: str) -> list[tuple[str, str | None]]:
+    """
+    Fixture klasöründeki satış dosyalarını, teslimat anahtarı aynı olan
+    gift card dosyasıyla eşleştirir. Eşi olmayan satış dosyası gift card'sız çalışır.
+    Dönüş: [(satış_yolu, gift_card_yolu veya None), ...] (dosya adına göre sıralı)
+    """
+    names = sorted(os.listdir(fixture_dir))
+    giftcards = {
+        get_delivery_key(n): os.path.join(fixture_dir, n)
+        for n in names if n.startswith(WATCH_GIFTCARD_PREFIX)
+    }
+    return [
+        (os.path.join(fixture_dir, n), giftcards.get(get_delivery_key(n)))
+        for n in names if n.startswith(WATCH_SALES_PREFIX)
+    ]
+
+
+def run_pipeline_stages(sales_path: str, giftcard_path: str | None, work_dir: str,
+                        trace_memory: bool = False) -> tuple[dict, dict]:
+    """
+    Rapor hattını (yükleme, kalite, tablolar, Excel) aşama aşama çalıştırır.
+    Dönüş: (sayfa tabloları, {aşama: süre_sn}) veya trace_memory ise
+    (sayfa tabloları, {aşama: tepe_bellek_mb}). Bellek tracemalloc ile
+    ölçülür (numpy / pandas tamponları dahil); ölçüm süreyi bozmasın diye
+    iki ölçüm ayrı çalıştırmalarda yapılır.
+    """
+    measures = {}
+    state = {"parse_errors": {}, "gc_parse_errors": {}}
+
+    def stage(name, fn):
+        if trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = fn()
+            measures[name] = (tracemalloc.get_traced_memory()[1] - base) / (1024 * 1024)
+        else:
+            started = time.perf_counter()
+            result = fn()
+            measures[name] = time.perf_counter() - started
+        return result
+
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        df, bad_sales = stage("satis_yukleme", lambda: load_data_with_bad_lines(
+            sales_path, state["parse_errors"]))
+        if giftcard_path:
+            df_gc, bad_gift = stage("giftcard_yukleme", lambda: load_giftcard_data_with_bad_lines(
+                giftcard_path, state["gc_parse_errors"]))
+        else:
+            df_gc, bad_gift = pd.DataFrame(), 0
+        quality_df = stage("veri_kalitesi", lambda: run_data_quality(
+            df, df_gc, state["parse_errors"], state["gc_parse_errors"],
+            os.path.join(work_dir, "karantina_satis.csv"),
+            os.path.join(work_dir, "karantina_giftcard.csv"),
+        ))
+        frames = stage("tablolar", lambda: build_report_frames(
+            df, df_gc, bad_sales, bad_gift, quality_df=quality_df))
+        stage("excel", lambda: export_to_excel(
+            df, df_gc, bad_sales, bad_gift,
+            output_file=os.path.join(work_dir, "rapor.xlsx"), frames=frames))
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return frames, measures
+
+
+def compare_frame_to_golden(current: pd.DataFrame, golden: pd.DataFrame,
+                            rtol: float = REGRESSION_RTOL,
+                            atol: float = REGRESSION_ATOL) -> list[str]:
+    """
+    Bir sayfa tablosunu golden CSV'den okunan haliyle karşılaştırır.
+    Golden her kolonu metin olarak okunur; sayısal kolonlar tolerans ile,
+    tarih kolonları tarih olarak, diğerleri birebir karşılaştırılır.
+    Dönüş: fark açıklamaları (boşsa aynı).
+    """
+    problems = []
+    if list(current.columns) != list(golden.columns):
+        return [f"kolonlar farklı: {list(current.columns)} != {list(golden.columns)}"]
+    if len(current) != len(golden):
+        return [f"satır sayısı farklı: {len(current)} != {len(golden)}"]
+
+    for col in current.columns:
+        cur = current[col].reset_index(drop=True)
+        gold = golden[col].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(cur):
+            gold_num = pd.to_numeric(gold.replace("", np.nan), errors="coerce").to_numpy(dtype="float64")
+            cur_num = cur.to_numpy(dtype="float64")
+            ok = np.isclose(cur_num, gold_num, rtol=rtol, atol=atol, equal_nan=True)
+        elif pd.api.types.is_datetime64_any_dtype(cur):
+            gold_dt = pd.to_datetime(gold.replace("", None), errors="coerce")
+            ok = ((cur == gold_dt) | (cur.isna() & gold_dt.isna())).to_numpy()
+        else:
+            ok = (cur.astype(object).where(cur.notna(), "").astype(str) == gold).to_numpy()
+        if not ok.all():
+            i = int(np.argmin(ok))
+            problems.append(f"{col}: {int((~ok).sum())} hücre farklı "
+                            f"(ilk fark satır {i + 1}: '{cur.iloc[i]}' != golden '{gold.iloc[i]}')")
+    return problems
+
+
+def check_budget(measured: dict, baseline: dict, ratio: float, slack: float, unit: str) -> list[str]:
+    """
+    Ölçülen aşama değerlerini baz çizgi * ratio + slack bütçesiyle karşılaştırır.
+    """
+    problems = []
+    for name, value in measured.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        budget = base * ratio + slack
+        if value > budget:
+            problems.append(f"{name}: {value:.2f} {unit} > bütçe {budget:.2f} {unit} "
+                            f"(baz çizgi {base:.2f} {unit})")
+    return problems
+
+
+def run_regression(regression_dir: str, record: bool = False) -> bool:
+    """
+    regression_dir/fixtures altındaki sabit CSV'lerle tüm hattı çalıştırır.
+    - record=True: her sayfa tablosunu regression_dir/golden/<dosya>/<sayfa>.csv
+      olarak, aşama süre / bellek ölçümlerini baseline.json'a yazar.
+    - record=False: tabloları golden çıktılarla tolerans içinde karşılaştırır,
+      aşama süre / tepe belleğini baz çizgiye göre bütçeyle kontrol eder.
+    Tüm kontroller geçerse True döner.
+    """
+    fixture_dir = os.path.join(regression_dir, "fixtures")
+    golden_dir = os.path.join(regression_dir, "golden")
+    baseline_path = os.path.join(golden_dir, REGRESSION_BASELINE_FILE)
+
+    fixtures = find_regression_fixtures(fixture_dir)
+    if not fixtures:
+        print(f"❌ {fixture_dir} içinde '{WATCH_SALES_PREFIX}*' fixture dosyası bulunamadı.")
+        return False
+
+    baseline = {} if record else load_ledger(baseline_path)
+    all_ok = True
+
+    for sales_path, giftcard_path in fixtures:
+        stem = get_file_stem(sales_path)
+        print(f"\n🧪 Regresyon: {os.path.basename(sales_path)}"
+              + (f" + {os.path.basename(giftcard_path)}" if giftcard_path else ""))
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            timings = []
+            for _ in range(max(1, REGRESSION_REPEATS)):
+                frames, seconds = run_pipeline_stages(sales_path, giftcard_path, work_dir)
+                timings.append(seconds)
+            seconds = {name: min(t[name] for t in timings) for name in timings[0]}
+            _, memory_mb = run_pipeline_stages(sales_path, giftcard_path, work_dir, trace_memory=True)
+
+        sheet_dir = os.path.join(golden_dir, stem)
+        if record:
+            os.makedirs(sheet_dir, exist_ok=True)
+            for sheet, frame in frames.items():
+                frame.to_csv(os.path.join(sheet_dir, f"{sheet}.csv"), sep=";", index=False,
+                             na_rep="", encoding="utf-8")
+            baseline[stem] = {"sure_sn": seconds, "tepe_mb": memory_mb}
+            print(f"📝 {len(frames)} tablo ve performans baz çizgisi kaydedildi: {sheet_dir}")
+            continue
+
+        problems = []
+        for sheet, frame in frames.items():
+            golden_path = os.path.join(sheet_dir, f"{sheet}.csv")
+            if not os.path.exists(golden_path):
+                problems.append(f"[{sheet}] golden çıktı yok: {golden_path}")
+                continue
+            golden = pd.read_csv(golden_path, sep=";", dtype=str, keep_default_na=False,
+                                 encoding="utf-8")
+            problems += [f"[{sheet}] {p}" for p in compare_frame_to_golden(frame, golden)]
+
+        base = baseline.get(stem)
+        if base is None:
+            problems.append("performans baz çizgisi yok (önce --record ile kaydedin)")
+        else:
+            problems += [f"[süre] {p}" for p in check_budget(
+                seconds, base["sure_sn"], REGRESSION_TIME_RATIO, REGRESSION_TIME_SLACK_SECONDS, "sn")]
+            problems += [f"[bellek] {p}" for p in check_budget(
+                memory_mb, base["tepe_mb"], REGRESSION_MEMORY_RATIO, REGRESSION_MEMORY_SLACK_MB, "MB")]
+
+        for name in seconds:
+            print(f"   {name:<18} {seconds[name]:8.3f} sn   {memory_mb[name]:9.1f} MB")
+        if problems:
+            all_ok = False
+            print(f"❌ {len(problems)} sorun:")
+            for p in problems:
+                print(f"   - {p}")
+        else:
+            print(f"✅ {len(frames)} tablo golden ile aynı, süre ve bellek bütçe içinde.")
+
+    if record:
+        os.makedirs(golden_dir, exist_ok=True)
+        save_ledger(baseline_path, baseline)
+
+    print("-" * 60)
+    return all_ok
+
+
+# === KLASÖR İZLEME (WATCH) MODU ===
+
+def get_delivery_key(file_name: str) -> str | None:
+    """
+    GfK dosya adındaki teslimat zaman damgasından (YYYYMMDDhhmmss)
+    gün anahtarını (YYYYMMDD) çıkarır. Satış ve gift card dosyaları
+    bu anahtar ile eşleştirilir. Zaman damgası yoksa None döner.
+    """
+    stamps = re.findall(r"(\d{14})", file_name)
+    if not stamps:
+        return None
+    return stamps[-1][:8]
+
+
+def load_ledger(path: str) -> dict:
+    """
+    Outbox'taki işlenmiş dosya kaydını okur. Kayıt yoksa boş sözlük döner.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_ledger(path: str, ledger: dict):
+    """
+    İşlenmiş dosya kaydını önce geçici dosyaya yazar, sonra atomik olarak
+    yerine koyar. Böylece yarıda kesilen bir yazım kaydı bozmaz.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ledger, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def scan_inbox(inbox: str, last_seen: dict) -> dict:
+    """
+    Inbox'taki GfK dosyalarını tarar ve boyutu/değişiklik zamanı bir önceki
+    taramadan beri değişmemiş (kopyalanması bitmiş) dosyaları döner.
+    last_seen sözlüğü taramalar arasında yerinde güncellenir.
+    Dönüş: {dosya_adı: tam_yol}
+    """
+    stable = {}
+    current = {}
+
+    for entry in os.scandir(inbox):
+        if not entry.is_file():
+            continue
+        if not entry.name.startswith((WATCH_SALES_PREFIX, WATCH_GIFTCARD_PREFIX)):
+            continue
+
+        st = entry.stat()
+        signature = (st.st_size, st.st_mtime)
+        current[entry.name] = signature
+
+        if last_seen.get(entry.name) == signature:
+            stable[entry.name] = entry.path
+
+    last_seen.clear()
+    last_seen.update(current)
+    return stable
+
+
+def watch_inbox(inbox: str, outbox: str,
+                poll_seconds: float = WATCH_POLL_SECONDS,
+                max_workers: int = WATCH_MAX_WORKERS,
+                once: bool = False,
+                memory_limit_mb: float | None = None,
+                cache_dir: str | None = None):
+    """
+    Inbox klasörünü izler, yeni gelen gfk_sales_* dosyalarını aynı günün
+    gfk_gift_card_* dosyası ile eşleştirip kuyruğa alır ve en fazla
+    max_workers teslimatı aynı anda işleyerek raporları outbox'a yazar.
+
+    - Her dosya en fazla bir kez işlenir: dosya işlenmeye başlamadan önce
+      outbox'taki kayda yazılır, program yeniden başlasa da tekrar alınmaz.
+    - Satış dosyası için gift card eşi WATCH_PAIR_WAIT_SECONDS kadar beklenir,
+      gelmezse rapor gift card datası olmadan üretilir.
+    - once=True ise mevcut dosyalar işlenip program sonlanır.
+    - memory_limit_mb verilirse tüm süreç için tek sınırdır; eşzamanlı işler
+      MemoryBudget ile bu sınırı paylaşır (iş başına bölünmez).
+    - cache_dir verilirse raporlar generate_report'ta sonuç önbelleğiyle üretilir.
+    """
+    os.makedirs(outbox, exist_ok=True)
+    ledger_path = os.path.join(outbox, WATCH_LEDGER_FILE)
+    ledger = load_ledger(ledger_path)
+
+    interrupted = [name for name, rec in ledger.items() if rec.get("durum") == "isleniyor"]
+    if interrupted:
+        print("⚠️ Önceki çalışmada yarıda kalan dosyalar tekrar işlenmeyecek:")
+        for name in interrupted:
+            print(f"   - {name}")
+
+    print(f"📂 Inbox izleniyor : {inbox}")
+    print(f"📤 Raporlar        : {outbox}")
+    print(f"⚙️  Eşzamanlı iş    : {max_workers}")
+    print("Durdurmak için Ctrl+C.\n")
+
+    memory_budget = MemoryBudget(memory_limit_mb) if memory_limit_mb else None
+    last_seen = {}
+    first_ready = {}     # satış dosyası -> ilk kez hazır görüldüğü an
+    running = {}         # future -> satış dosyası adı
+    scans = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while True:
+                # Biten işleri kayda işle
+                for future in [f for f in running if f.done()]:
+                    name = running.pop(future)
+                    try:
+                        output_file = future.result()
+                        ledger[name]["durum"] = "tamamlandi"
+                        ledger[name]["rapor"] = output_file
+                    except Exception as e:
+                        ledger[name]["durum"] = "hata"
+                        ledger[name]["hata"] = str(e)
+                        print(f"\n❌ {name} işlenemedi: {e}")
+                    ledger[name]["bitis"] = datetime.now().isoformat(timespec="seconds")
+                    save_ledger(ledger_path, ledger)
+
+                stable = {n: p for n, p in scan_inbox(inbox, last_seen).items() if n not in ledger}
+
+                giftcards = {}
+                for name in sorted(n for n in stable if n.startswith(WATCH_GIFTCARD_PREFIX)):
+                    giftcards[get_delivery_key(name)] = name   # aynı gün için en son teslimat
+
+                sales = sorted(n for n in stable if n.startswith(WATCH_SALES_PREFIX))
+                now = time.monotonic()
+
+                for name in sales:
+                    if len(running) >= max_workers:
+                        break   # kalan dosyalar bir sonraki turda kuyruktan alınır
+
+                    key = get_delivery_key(name)
+                    gc_name = giftcards.get(key) if key else None
+
+                    first_ready.setdefault(name, now)
+                    waited = now - first_ready[name]
+                    if gc_name is None and not once and waited < WATCH_PAIR_WAIT_SECONDS:
+                        continue
+
+                    output_file = os.path.join(
+                        outbox, f"statvision_report_{get_file_stem(name)}.xlsx"
+                    )
+                    started = datetime.now().isoformat(timespec="seconds")
+                    ledger[name] = {"durum": "isleniyor", "baslangic": started, "giftcard": gc_name}
+                    if gc_name:
+                        ledger[gc_name] = {"durum": "eslendi", "baslangic": started, "satis": name}
+                        giftcards.pop(key)
+                    save_ledger(ledger_path, ledger)
+                    first_ready.pop(name, None)
+
+                    print(f"\n📥 Kuyruğa alındı: {name}" + (f" + {gc_name}" if gc_name else ""))
+                    future = pool.submit(
+                        generate_report,
+                        stable[name],
+                        stable[gc_name] if gc_name else None,
+                        output_file,
+                        cache_dir=cache_dir,
+                        memory_budget=memory_budget,
+                    )
+                    running[future] = name
+
+                # İlk tarama dosyaları sadece "görür", stabil olup olmadıkları ikinci turda anlaşılır
+                scans += 1
+                waiting = [n for n in last_seen if n.startswith(WATCH_SALES_PREFIX) and n not in ledger]
+                if once and scans >= 2 and not running and not waiting:
+                    break
+
+                time.sleep(poll_seconds)
+
+        except KeyboardInterrupt:
+            print("\n🛑 İzleme durduruldu, çalışan işlerin bitmesi bekleniyor...")
+            for future, name in running.items():
+                try:
+                    ledger[name]["rapor"] = future.result()
+                    ledger[name]["durum"] = "tamamlandi"
+                except Exception as e:
+                    ledger[name]["durum"] = "hata"
+                    ledger[name]["hata"] = str(e)
+            save_ledger(ledger_path, ledger)
 
 
 # === MAIN ===
 
-def main():
+def parse_formats(value: str) -> list[str]:
+    """
+    --formats değerini listeye çevirir; bilinmeyen format data yüklenmeden
+    argparse kullanım hatası olarak döner.
+    """
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMAT_CHOICES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"bilinmeyen format: {', '.join(unknown)} (seçenekler: {', '.join(REPORT_FORMAT_CHOICES)})"
+        )
+    if not formats:
+        raise argparse.ArgumentTypeError("en az bir format verilmeli")
+    return formats
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="STATVISION - Teknosa GfK raporlama motoru")
+    parser.add_argument("--watch", metavar="INBOX",
+                        help="Inbox klasörünü izleyip gelen GfK dosyalarını otomatik raporla")
+    parser.add_argument("--outbox", default="outbox",
+                        help="Watch modunda raporların yazılacağı klasör (varsayılan: outbox)")
+    parser.add_argument("--workers", type=int, default=WATCH_MAX_WORKERS,
+                        help="Watch modunda aynı anda işlenecek en fazla teslimat")
+    parser.add_argument("--poll", type=float, default=WATCH_POLL_SECONDS,
+                        help="Watch modunda inbox tarama aralığı (saniye)")
+    parser.add_argument("--once", action="store_true",
+                        help="Watch modunda mevcut dosyaları işleyip çık")
+    parser.add_argument("--batch-query", metavar="TERMS_FILE",
+                        help="Dosyadaki (her satırda bir) ürün ifadeleri için toplu sorgu yap")
+    parser.add_argument("--batch-output", metavar="PATH",
+                        help="Toplu sorgu çıktısı (.xlsx veya .csv)")
+    parser.add_argument("--preview", action="store_true",
+                        help="Tüm dosyayı okumadan örneklemle hızlı tahmini rapor göster")
+    parser.add_argument("--preview-blocks", type=int, default=PREVIEW_BLOCKS,
+                        help="Önizlemede dosyanın bölüneceği dilim sayısı")
+    parser.add_argument("--memory-limit", type=float, metavar="MB",
+                        help="Bellek sınırı (MB); verilirse yükleme planlayıcıya göre yapılır")
+    parser.add_argument("--catalogue", metavar="PATH",
+                        help="Tüm ürün kataloğunu ayrıca .parquet veya .csv olarak yaz")
+    parser.add_argument("--to-dataset", metavar="DIR",
+                        help="Satış datasını hafta/kanal bölümlü Parquet veri setine dönüştür")
+    parser.add_argument("--dataset", metavar="DIR",
+                        help="Raporu CSV yerine bölümlü Parquet veri setinden üret")
+    parser.add_argument("--week", action="append",
+                        help="Veri seti filtresi: hafta (YYYYWW), birden çok verilebilir")
+    parser.add_argument("--channel", action="append", choices=["Online", "Fiziksel", "Bilinmeyen"],
+                        help="Veri seti filtresi: kanal")
+    parser.add_argument("--store", action="append",
+                        help="Veri seti filtresi: mağaza (Magaza)")
+    parser.add_argument("--category", action="append",
+                        help="Veri seti filtresi: kategori (Kategori2)")
+    parser.add_argument("--formats", type=parse_formats, default=list(REPORT_FORMATS), metavar="LIST",
+                        help=f"Rapor çıktı formatları, virgülle: {','.join(REPORT_FORMAT_CHOICES)} "
+                             f"(varsayılan: {','.join(REPORT_FORMATS)})")
+    parser.add_argument("--process-workers", type=int, default=PROCESS_WORKERS, metavar="N",
+                        help="Rapor bölümlerini paylaşılan bellekteki tek kopya data üzerinden "
+                             "N süreçte hesapla (varsayılan: 0, iş parçacıkları)")
+    parser.add_argument("--cache-dir", default=RESULT_CACHE_DIR,
+                        help=f"Rapor bölümü sonuç önbelleği klasörü (varsayılan: {RESULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Sonuç önbelleğini kullanma, tüm bölümleri yeniden hesapla")
+    parser.add_argument("--regression", metavar="DIR",
+                        help="DIR/fixtures ile tüm hattı çalıştırıp DIR/golden çıktılarıyla karşılaştır")
+    parser.add_argument("--record", action="store_true",
+                        help="Regresyon modunda golden çıktıları ve performans baz çizgisini yeniden kaydet")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
     print_banner()
 
-    # Bozuk satır sayıları
-    print("Bozuk satırlar analiz ediliyor...")
-    bad_sales = count_bad_lines(FILE_PATH)
-    bad_gift = count_bad_lines(GIFTCARD_FILE_PATH)
+    if args.watch:
+        watch_inbox(args.watch, args.outbox,
+                    poll_seconds=args.poll,
+                    max_workers=max(1, args.workers),
+                    once=args.once,
+                    memory_limit_mb=args.memory_limit,
+                    cache_dir=None if args.no_cache else args.cache_dir)
+        print_goodbye()
+        return
+
+    if args.regression:
+        ok = run_regression(args.regression, record=args.record)
+        print_goodbye()
+        raise SystemExit(0 if ok else 1)
+
+    if args.preview:
+        preview_report(FILE_PATH, n_blocks=max(2, args.preview_blocks))
+        print_goodbye()
+        return
+
+    if args.to_dataset:
+        convert_to_dataset(FILE_PATH, args.to_dataset, week=(args.week or [None])[0])
+        print_goodbye()
+        return
+
+    if args.dataset:
+        run_dataset_report(args.dataset, {
+            DATASET_WEEK_COL: args.week,
+            DATASET_CHANNEL_COL: args.channel,
+            STORE_COL: args.store,
+            CATEGORY_COL: args.category,
+        })
+        print_goodbye()
+        return
+
+    if args.batch_query:
+        df = load_data(FILE_PATH)
+        export_batch_query(df, args.batch_query, args.batch_output)
+        print_goodbye()
+        return
 
-    # Ana satış datası
-    df = load_data(FILE_PATH)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sales_quarantine = f"statvision_karantina_satis_{timestamp}.csv"
+
+    # Ana satış datası (bozuk satırlar okuma sırasında sayılır)
+    print("Bozuk satırlar analiz ediliyor...")
+    dialect = sniff_dialect(FILE_PATH)
+    print(f"Girdi: kodlama={dialect['encoding']}, ayraç={dialect['sep']!r}, "
+          f"ondalık={dialect['decimal'] or '?'}, parser={dialect['engine']}")
+    parse_errors, gc_parse_errors = {}, {}
+    if args.memory_limit:
+        plan = plan_execution(FILE_PATH, args.memory_limit)
+        print_plan(plan)
+        df, bad_sales, extras = load_data_planned(FILE_PATH, plan, parse_errors, sales_quarantine)
+    else:
+        df, bad_sales = load_data_with_bad_lines(FILE_PATH, parse_errors)
+        extras = {}
 
     print_total(df)
     print_category(df)
@@ -1051,11 +4450,28 @@ def main():
     print_top_products(df)
 
     # Gift card datası
-    df_gc = load_giftcard_data(GIFTCARD_FILE_PATH)
+    df_gc, bad_gift = load_giftcard_data_with_bad_lines(GIFTCARD_FILE_PATH, gc_parse_errors)
     print_giftcard_products(df_gc)
+    print_giftcard_reconciliation(df, df_gc)
+    print_daily_trend(df)
+
+    # Veri kalitesi kontrolleri + karantina dosyaları
+    quality_df = run_data_quality(
+        df, df_gc, parse_errors, gc_parse_errors,
+        sales_quarantine,
+        f"statvision_karantina_giftcard_{timestamp}.csv",
+        sales_quality=extras.get("quality_df"),
+    )
+
+    # Rapor çıktıları (varsayılan sadece Excel)
+    export_report(df, df_gc, bad_sales, bad_gift, formats=args.formats,
+                  output_base=f"statvision_report_{timestamp}",
+                  quality_df=quality_df, price_stats=extras.get("price_stats"),
+                  cache=None if args.no_cache else ResultCache(args.cache_dir),
+                  process_workers=max(0, args.process_workers))
 
-    # Excel raporu
-    export_to_excel(df, df_gc, bad_sales, bad_gift)
+    if args.catalogue:
+        export_product_catalogue(df, args.catalogue)
 
     print(f"\n⚠️ Satış datasında bozuk satır sayısı    : {bad_sales:,}")
     print(f"⚠️ Gift card datasında bozuk satır sayısı: {bad_gift:,}")
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TEKNOSA_REPORT_V9 as report
+
+
+def write_fixed_width_csv(path, n_rows):
+    # Tüm satırlar aynı uzunlukta: dilim sınırları satır başlarına denk gelir
+    lines = [f"{report.STORE_COL};{report.CATEGORY_COL};{report.QTY_COL};{report.REVENUE_COL}"]
+    for i in range(n_rows):
+        lines.append(f"M{i % 7:03d};K{i % 3};{i % 5 + 1};{(i * 37) % 1000 + 100:04d}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("n_blocks", [1, 3, 10, 25, 100])
+def test_full_coverage_sample_equals_exact_totals(tmp_path, n_blocks):
+    path = tmp_path / "gfk_sales_test.csv"
+    write_fixed_width_csv(path, 500)
+    exact = pd.read_csv(path, sep=";")
+
+    sample, fraction, block_bytes = report.sample_byte_ranges(str(path), n_blocks=n_blocks,
+                                                              block_bytes=10 ** 6, seed=0)
+    for col in (report.QTY_COL, report.REVENUE_COL):
+        sample[col] = pd.to_numeric(sample[col])
+
+    assert fraction == 1.0
+    assert block_bytes < 10 ** 6
+    header_bytes = len(path.read_bytes().split(b"\n")[0]) + 1
+    assert n_blocks * block_bytes >= path.stat().st_size - header_bytes
+    assert len(sample) == len(exact)
+
+    total = report.estimate_totals(sample, n_blocks, fraction).iloc[0]
+    assert total["Tahmini_Adet"] == exact[report.QTY_COL].sum()
+    assert total["Tahmini_Ciro"] == exact[report.REVENUE_COL].sum()
+    assert total["Adet_GA"] == 0
+    assert total["Ciro_GA"] == 0
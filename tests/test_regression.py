@@ -0,0 +1,14 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TEKNOSA_REPORT_V9 as report
+
+REGRESSION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression")
+
+
+def test_fixtures_match_golden_and_baseline():
+    # Golden / baseline güncellemek için:
+    #   python TEKNOSA_REPORT_V9.py --regression tests/regression --record
+    assert report.run_regression(REGRESSION_DIR, record=False)
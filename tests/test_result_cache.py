@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TEKNOSA_REPORT_V9 as report
+
+
+def make_sales_df():
+    return pd.DataFrame({
+        report.STORE_COL: ["TRENDYOL", "KADIKOY", "KADIKOY"],
+        report.QTY_COL: [1.0, 2.0, 3.0],
+        report.REVENUE_COL: [100.0, 200.0, 300.0],
+    })
+
+
+def test_same_data_and_config_hits(tmp_path):
+    df = make_sales_df()
+    report.ResultCache(str(tmp_path)).call(report.get_store_online_offline_df, df)
+
+    cache = report.ResultCache(str(tmp_path))
+    cache.call(report.get_store_online_offline_df, df)
+    assert cache.hits == ["get_store_online_offline_df"]
+    assert cache.misses == []
+
+
+def test_changed_constant_misses(tmp_path, monkeypatch):
+    df = make_sales_df()
+    first, _ = report.ResultCache(str(tmp_path)).call(report.get_store_online_offline_df, df)
+    assert "KADIKOY" not in set(first[report.STORE_COL])
+
+    monkeypatch.setattr(report, "ONLINE_STORES", report.ONLINE_STORES | {"KADIKOY"})
+    cache = report.ResultCache(str(tmp_path))
+    online, _ = cache.call(report.get_store_online_offline_df, df)
+    assert cache.hits == []
+    assert cache.misses == ["get_store_online_offline_df"]
+    assert "KADIKOY" in set(online[report.STORE_COL])
+
+
+def patched_print_banner():
+    print("başka bir başlık")
+
+
+def patched_get_channel_labels(df):
+    return pd.Series("Online", index=df.index)
+
+
+def make_daily_df():
+    return pd.DataFrame({
+        report.DATE_COL: pd.to_datetime(["2025-11-10", "2025-11-11"]),
+        report.ORG_COL: [6001.0, 1001.0],
+        report.QTY_COL: [1.0, 2.0],
+        report.REVENUE_COL: [100.0, 200.0],
+    })
+
+
+def test_unrelated_function_edit_still_hits(tmp_path, monkeypatch):
+    df = make_daily_df()
+    report.ResultCache(str(tmp_path)).call(report.get_daily_channel_df, df)
+
+    monkeypatch.setattr(report, "print_banner", patched_print_banner)
+    cache = report.ResultCache(str(tmp_path))
+    cache.call(report.get_daily_channel_df, df)
+    assert cache.hits == ["get_daily_channel_df"]
+
+
+def test_called_helper_edit_misses(tmp_path, monkeypatch):
+    df = make_daily_df()
+    report.ResultCache(str(tmp_path)).call(report.get_daily_channel_df, df)
+
+    monkeypatch.setattr(report, "get_channel_labels", patched_get_channel_labels)
+    cache = report.ResultCache(str(tmp_path))
+    daily = cache.call(report.get_daily_channel_df, df)
+    assert cache.misses == ["get_daily_channel_df"]
+    assert daily["Fiziksel_Adet"].sum() == 0